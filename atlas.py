@@ -0,0 +1,150 @@
+# Sprite atlas for the games.
+# `python atlas.py` packs every PNG in images/ into one or a few atlas pages
+# (build/atlas/atlas-N.png) with an index of where each image sits
+# (build/atlas/atlas.json). install() loads the pages and puts a subsurface
+# for each image into pgzero's image cache, so Actor('wall') and
+# screen.blit('wall', ...) draw straight from the shared atlas surface and
+# startup decodes one file per page instead of one per image. The atlas is
+# rebuilt automatically when a source PNG is added, removed or changed.
+import json
+import os
+
+import pygame
+from pgzero import loaders
+
+PAGE_SIZE = 2048  # Max atlas page width/height
+PADDING = 1       # Gap between packed images
+
+installed = False
+
+
+def paths(root=None):
+    root = root or loaders.root
+    out_dir = os.path.join(root, "build", "atlas")
+    return os.path.join(root, "images"), out_dir, os.path.join(out_dir, "atlas.json")
+
+
+def source_stamps(images_dir):
+    stamps = {}
+    for filename in sorted(os.listdir(images_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() == ".png":
+            stat = os.stat(os.path.join(images_dir, filename))
+            stamps[name] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def read_index(index_path):
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(index, images_dir, out_dir):
+    if not index or index.get("sources") != source_stamps(images_dir):
+        return False
+    return all(os.path.exists(os.path.join(out_dir, page)) for page in index["pages"])
+
+
+def pack(sizes):
+    # Shelf packing, tallest images first. Returns {name: [page, x, y]}.
+    placed = {}
+    page, x, y, shelf_height = 0, 0, 0, 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > PAGE_SIZE:
+            x, y, shelf_height = 0, y + shelf_height + PADDING, 0
+        if y + h > PAGE_SIZE:
+            page, x, y, shelf_height = page + 1, 0, 0, 0
+        placed[name] = [page, x, y]
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return placed
+
+
+def build(root=None, force=False):
+    # Rebuild the atlas if the source images changed. Returns the index.
+    images_dir, out_dir, index_path = paths(root)
+    index = read_index(index_path)
+    if not force and is_current(index, images_dir, out_dir):
+        return index
+
+    stamps = source_stamps(images_dir)
+    surfaces = {name: pygame.image.load(os.path.join(images_dir, name + ".png")) for name in stamps}
+    sizes = {name: surface.get_size() for name, surface in surfaces.items()}
+    too_big = [name for name, (w, h) in sizes.items() if w > PAGE_SIZE or h > PAGE_SIZE]
+    for name in too_big:
+        del sizes[name]  # Left to the normal loader
+
+    placed = pack(sizes)
+    page_count = max((page for page, _, _ in placed.values()), default=-1) + 1
+    extents = [[0, 0] for _ in range(page_count)]  # Trim pages to what they use
+    for name, (page, x, y) in placed.items():
+        w, h = sizes[name]
+        extents[page] = [max(extents[page][0], x + w), max(extents[page][1], y + h)]
+    pages = [pygame.Surface(size, pygame.SRCALPHA) for size in extents]
+
+    regions = {}
+    for name, (page, x, y) in placed.items():
+        pages[page].blit(surfaces[name], (x, y))
+        w, h = sizes[name]
+        regions[name] = [page, x, y, w, h]
+
+    os.makedirs(out_dir, exist_ok=True)
+    page_files = []
+    for i, surface in enumerate(pages):
+        page_files.append(f"atlas-{i}.png")
+        replace_file(os.path.join(out_dir, page_files[-1]), lambda path: pygame.image.save(surface, path))
+
+    index = {"pages": page_files, "regions": regions, "sources": stamps}
+
+    def write_index(path):
+        with open(path, "w") as f:
+            json.dump(index, f, indent=1)
+    replace_file(index_path, write_index)  # Last, so it never names pages that aren't there yet
+    return index
+
+
+def replace_file(path, write):
+    # write(temp path) next to path, then move it over path in one step, so
+    # a game starting at the same time never reads a half-written file
+    base, ext = os.path.splitext(path)
+    temp_path = f"{base}.{os.getpid()}.tmp{ext}"  # pygame picks the image format from the extension
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)  # Only left over if writing failed
+
+
+def load_pages(root=None):
+    # Decode the atlas pages (building first if needed). Needs no window.
+    _, out_dir, _ = paths(root)
+    index = build(root)
+    pages = [pygame.image.load(os.path.join(out_dir, page)) for page in index["pages"]]
+    return index, pages
+
+
+def install(root=None, loaded=None):
+    # Point pgzero's image cache at atlas regions. Needs the window open.
+    global installed
+    if installed:
+        return
+    index, pages = loaded or load_pages(root)
+    pages = [page.convert_alpha() for page in pages]
+
+    cache = loaders.images.cache
+    for name, (page, x, y, w, h) in index["regions"].items():
+        cache[loaders.images.cache_key(name, (), {})] = pages[page].subsurface((x, y, w, h))
+    installed = True
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.abspath(__file__))
+    images_dir, out_dir, index_path = paths(root)
+    was_current = is_current(read_index(index_path), images_dir, out_dir)
+    index = build(root)
+    state = "up to date" if was_current else "built"
+    print(f"Atlas {state}: {len(index['regions'])} images in {len(index['pages'])} page(s) at {out_dir}")
@@ -1,15 +1,18 @@
 import os
-import sys
 from random import randint
 import pgzrun
 import pygame
+import atlas
+import minigame
+from text_cache import Label, draw_text
 
 os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
 
+atlas.install()  # Images are drawn from the sprite atlas
+
 # --- CONSTANTS ---
 WIDTH, HEIGHT = 800, 600
 WIN_SCORE = 10
-RESULT_FILE = "results.txt"
 BIRD_Y_RANGE = (10, 200)
 
 # --- ACTORS ---
@@ -30,6 +33,8 @@ update_counter = 0
 dev_mode = False
 noclip = False
 
+score_label = Label("Score: {}/{}", pos=(650, 10), color="black")
+
 
 def on_key_down(key):
     global noclip, score
@@ -69,7 +74,7 @@ def draw():
             draw_hitboxes()
             draw_dev_info()
 
-        screen.draw.text(f"Score: {score}/{WIN_SCORE}", (650, 10), color="black")
+        score_label.draw(screen, score, WIN_SCORE)
     else:
         display_end_screen()
 
@@ -89,7 +94,7 @@ def draw_dev_info():
         f"Score Edit: Left/Right"
     ]
     for i, text in enumerate(info):
-        screen.draw.text(text, (10, 10 + (i * 20)), fontsize=20, color="yellow")
+        draw_text(screen, text, pos=(10, 10 + (i * 20)), fontsize=20, color="yellow")
 
 
 def update():
@@ -149,15 +154,14 @@ def finish_game(status):
     global game_over, game_won
     game_over = True
     game_won = (status == "WIN")
-    with open(RESULT_FILE, "w") as f:
-        f.write(status)
-    clock.schedule(sys.exit, 2.0)
+    minigame.finish(status, 2.0, score=score)
 
 
 def display_end_screen():
     msg = "YOU WIN!" if game_won else "GAME OVER"
     color = "green" if game_won else "red"
-    screen.draw.text(msg, center=(WIDTH / 2, HEIGHT / 2), fontsize=70, color=color, owidth=1, ocolor="white")
+    draw_text(screen, msg, center=(WIDTH / 2, HEIGHT / 2), fontsize=70, color=color, owidth=1, ocolor="white")
 
 
+minigame.begin(globals())
 pgzrun.go()
\ No newline at end of file
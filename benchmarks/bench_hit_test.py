@@ -0,0 +1,74 @@
+# Click resolution benchmark: finding the topmost star under the mouse.
+# Compares the old loop over Actor.collidepoint() (for a random click, and
+# for one that misses and has to look at every star) with
+# hit_test.topmost() on star positions kept in arrays, as red.py and
+# shoot.py keep them. The topmost() time includes making the corner arrays
+# from the positions. "from actors" is what it costs to read the corners
+# off the Actors instead, which is why the games keep arrays.
+# Usage: python benchmarks/bench_hit_test.py [targets ...]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+import numpy as np
+import pygame
+from pgzero import loaders
+from pgzero.actor import Actor
+from hit_test import topmost
+
+DEFAULT_COUNTS = [10, 100, 1000, 10000]
+WIDTH, HEIGHT = 800, 600
+CLICKS = 2000
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    loaders.set_root(ROOT)
+    rng = random.Random(1)
+    clicks = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(CLICKS)]
+
+    print(f"{'targets':>8} {'loop (us)':>10} {'miss (us)':>10} {'topmost (us)':>13} {'from actors (us)':>17}")
+    for count in counts:
+        stars = [Actor(rng.choice(["red-star", "green-star", "blue-star"]),
+                       (rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))) for _ in range(count)]
+        star_pos = np.array([star.pos for star in stars], dtype=float)
+        star_half = np.array([(star.width / 2, star.height / 2) for star in stars], dtype=float)
+        queued = iter(clicks * (count // 10 + 100))
+
+        def loop(pos=None):
+            # Topmost hit: scan from the last drawn
+            pos = pos or next(queued)
+            for i in range(count - 1, -1, -1):
+                if stars[i].collidepoint(pos):
+                    return i
+            return None
+
+        def from_actors():
+            corners = np.array([(s.left, s.top, s.right, s.bottom) for s in stars], dtype=float)
+            return topmost(corners[:, :2], corners[:, 2:], next(queued))
+
+        repeat = max(20, CLICKS * 100 // max(count, 1))
+        loop_time = timed(loop, repeat)
+        miss_time = timed(lambda: loop((-100, -100)), repeat)
+        topmost_time = timed(lambda: topmost(star_pos - star_half, star_pos + star_half, next(queued)), repeat)
+        actors_time = timed(from_actors, max(5, repeat // 10))
+
+        print(f"{count:>8} {loop_time * 1e6:>10.1f} {miss_time * 1e6:>10.1f} {topmost_time * 1e6:>13.1f} "
+              f"{actors_time * 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
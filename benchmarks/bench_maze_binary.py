@@ -0,0 +1,50 @@
+# Text vs compiled (.cmz, memory-mapped) maze load time.
+# Usage: python benchmarks/bench_maze_binary.py [size ...]
+# "open" is the time until the maze can be played from the start cell;
+# "scan" additionally reads every cell once (what star placement does).
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench_maze_grid import write_maze
+from maze_compiler import compile_maze, load_compiled
+from maze_grid import MazeGrid, PATH
+
+DEFAULT_SIZES = [100, 1000, 4000, 10000]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'format':>7} {'open (ms)':>10} {'scan (ms)':>10} {'file (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            text_path = os.path.join(tmp, f"maze-{size}.txt")
+            binary_path = os.path.join(tmp, f"maze-{size}.cmz")
+            write_maze(text_path, size)
+            compile_maze(text_path, binary_path)
+
+            for name, path, loader in (("text", text_path, MazeGrid.load), ("binary", binary_path, load_compiled)):
+                open_time, grid = timed(lambda: loader(path))
+                r, c = grid.start
+                grid.get(r, c)
+                scan_time, _ = timed(lambda: grid.count(PATH))
+                size_mb = os.path.getsize(path) / 1e6
+                print(f"{size:>6} {name:>7} {open_time * 1000:>10.2f} {(open_time + scan_time) * 1000:>10.2f} "
+                      f"{size_mb:>10.1f}")
+                del grid
+
+            os.remove(text_path)
+            os.remove(binary_path)
+
+
+if __name__ == "__main__":
+    main()
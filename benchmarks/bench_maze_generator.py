@@ -0,0 +1,67 @@
+# Maze generator benchmark: NumPy sidewinder vs the same algorithm written
+# as a per-cell Python loop, plus the cost of writing the result out.
+# Usage: python benchmarks/bench_maze_generator.py [size ...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from maze_compiler import write_compiled
+from maze_generator import CLOSE_CHANCE, generate
+from maze_grid import MazeGrid, PATH, START, FINISH
+
+DEFAULT_SIZES = [1000, 4000, 10000]
+LOOP_MAX = 4000  # The per-cell loop gets very slow past this
+
+
+def generate_loop(size, seed=None):
+    # Reference version: one room at a time
+    rng = random.Random(seed)
+    size -= 1 - size % 2
+    rooms = (size - 1) // 2
+    grid = MazeGrid(size, size)
+    for i in range(rooms):
+        run_start = 0
+        for j in range(rooms):
+            grid.set(i * 2 + 1, j * 2 + 1, PATH)
+            if i > 0 and (j == rooms - 1 or rng.random() < CLOSE_CHANCE):
+                k = rng.randint(run_start, j)
+                grid.set(i * 2, k * 2 + 1, PATH)
+                run_start = j + 1
+            elif j < rooms - 1:
+                grid.set(i * 2 + 1, j * 2 + 2, PATH)
+    grid.set(1, 1, START)
+    grid.set(size - 2, size - 2, FINISH)
+    return grid
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'numpy (s)':>10} {'loop (s)':>10} {'.cmz (s)':>10} {'.txt (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            gen_time, grid = timed(lambda: generate(size, size, seed=size))
+            loop_time = timed(lambda: generate_loop(size, seed=size))[0] if size <= LOOP_MAX else None
+
+            path = os.path.join(tmp, "maze")
+            cmz_time, _ = timed(lambda: write_compiled(grid, path + ".cmz"))
+            txt_time, _ = timed(lambda: grid.save(path + ".txt"))
+            os.remove(path + ".cmz")
+            os.remove(path + ".txt")
+            del grid
+
+            loop = f"{loop_time:>10.3f}" if loop_time is not None else f"{'-':>10}"
+            print(f"{size:>6} {gen_time:>10.3f} {loop} {cmz_time:>10.3f} {txt_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
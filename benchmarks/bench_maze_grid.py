@@ -0,0 +1,81 @@
+# Load-time and memory benchmark for MazeGrid vs the old list-of-lists maze.
+# Usage: python benchmarks/bench_maze_grid.py [size ...]
+# The old loader also built one Actor per cell, which is not counted here,
+# so the real gap is bigger than the numbers shown.
+import os
+import sys
+import random
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from maze_grid import MazeGrid
+
+DEFAULT_SIZES = [100, 500, 1000, 2000, 4000]
+LEGACY_MAX = 2000  # The old loader gets very slow past this
+
+
+def write_maze(path, size):
+    rng = random.Random(size)
+    with open(path, "w") as f:
+        for r in range(size):
+            if r == 0 or r == size - 1:
+                row = "w" * size
+            else:
+                row = "w" + "".join(rng.choice("wooo") for _ in range(size - 2)) + "w"
+            if r == 1:
+                row = "ws" + row[2:]
+            elif r == size - 2:
+                row = row[:-2] + "fw"
+            f.write(row + "\n")
+
+
+def load_legacy(path):
+    # Same parsing as the old get_maze(), without the Actor grid
+    maze = []
+    with open(path, "r") as file:
+        r = 0
+        for row in file.readlines():
+            maze.append([])
+            for column in row:
+                if column in "xwsfo":
+                    maze[r].append(column)
+                elif column == "\n":
+                    r += 1
+    return maze
+
+
+def measure(loader, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = loader(path)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current, peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'loader':>7} {'load (s)':>10} {'kept (MB)':>10} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"maze-{size}.txt")
+            write_maze(path, size)
+
+            loaders = [("grid", MazeGrid.load)]
+            if size <= LEGACY_MAX:
+                loaders.append(("legacy", load_legacy))
+
+            for name, loader in loaders:
+                elapsed, kept, peak = measure(loader, path)
+                print(f"{size:>6} {name:>7} {elapsed:>10.3f} {kept / 1e6:>10.1f} {peak / 1e6:>10.1f}")
+
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Results store benchmark: how long record() blocks the caller, how fast the
+# writer thread gets rows to disk, and query times as the table grows.
+# Usage: python benchmarks/bench_results_store.py [rows ...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from results_store import MAZE_GAME, ResultStore, connect, percentiles, win_rates
+
+DEFAULT_ROWS = [100000, 1000000]
+GAMES = [MAZE_GAME, "Happy Garden", "Balloon Flight", "Sleeping Dragons", "Shoot the Fruit", "Red Alert"]
+
+
+def fake_result(rng):
+    mean = rng.uniform(15, 18)
+    return {
+        "outcome": rng.choice(["WIN", "LOSS"]),
+        "score": rng.randint(0, 25),
+        "elapsed": round(rng.uniform(5, 120), 3),
+        "frames": {"count": rng.randint(300, 7200), "mean_ms": round(mean, 2),
+                   "p95_ms": round(mean + rng.expovariate(0.5), 2), "max_ms": round(mean + rng.expovariate(0.1), 2)},
+    }
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS
+    rng = random.Random(1)
+    results = [fake_result(rng) for _ in range(10000)]
+
+    print(f"{'rows':>8} {'record (us)':>12} {'write (s)':>10} {'win rates (ms)':>15} {'p50/95/99 (ms)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            path = os.path.join(tmp, f"results-{count}.sqlite")
+            store = ResultStore(path)
+            start = time.perf_counter()
+            for i in range(count):
+                store.record(GAMES[i % len(GAMES)], results[i % len(results)], session=i // 10, lives=3)
+            record_time = time.perf_counter() - start
+            store.close()
+            write_time = time.perf_counter() - start
+
+            db = connect(path)
+            rates_time, _ = timed(lambda: win_rates(db))
+            spread_time, _ = timed(lambda: percentiles(db, "Red Alert"))
+            db.close()
+
+            print(f"{count:>8} {record_time / count * 1e6:>12.2f} {write_time:>10.2f} "
+                  f"{rates_time * 1000:>15.1f} {spread_time * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Spatial hash benchmark: finding the flowers under the character in a
+# crowded garden, scanning every flower (what garden.py used to do) vs
+# querying spatial_hash.SpatialHash, plus the cost of keeping the hash up to
+# date as flowers come and go.
+# Usage: python benchmarks/bench_spatial_hash.py [flowers ...]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pgzero.rect import ZRect
+from spatial_hash import SpatialHash
+
+DEFAULT_COUNTS = [100, 1000, 10000]
+WIDTH, HEIGHT = 800, 600
+FLOWER_SIZE = (66, 83)
+CHAR_SIZE = (92, 101)
+QUERIES = 2000
+
+
+def garden(count, rng):
+    # Flowers where garden.new_flower() plants them
+    return [ZRect((rng.randint(50, WIDTH - 50) - FLOWER_SIZE[0] / 2, rng.randint(150, HEIGHT - 100) - FLOWER_SIZE[1] / 2),
+                  FLOWER_SIZE) for _ in range(count)]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS
+    rng = random.Random(1)
+    chars = [ZRect((rng.randint(0, WIDTH), rng.randint(150, HEIGHT)), CHAR_SIZE) for _ in range(QUERIES)]
+
+    print(f"{'flowers':>8} {'scan (us)':>10} {'hash (us)':>10} {'speedup':>8} {'insert (us)':>12} {'remove (us)':>12}")
+    for count in counts:
+        flowers = garden(count, rng)
+        chars_left = iter(chars * (count // 100 + 1))
+
+        def scan():
+            char = next(chars_left)
+            return [i for i, flower in enumerate(flowers) if flower.colliderect(char)]
+
+        flower_hash = SpatialHash()
+        insert_time = timed(lambda: [flower_hash.insert(i, flower) for i, flower in enumerate(flowers)], 1) / count
+
+        def query():
+            char = next(chars_left)
+            return [i for i in flower_hash.query(char) if flowers[i].colliderect(char)]
+
+        repeat = max(10, QUERIES * 100 // count)
+        scan_time = timed(scan, repeat)
+        hash_time = timed(query, repeat)
+        remove_time = timed(lambda: [flower_hash.remove(i) for i in range(count)], 1) / count
+
+        print(f"{count:>8} {scan_time * 1e6:>10.1f} {hash_time * 1e6:>10.1f} {scan_time / hash_time:>7.1f}x "
+              f"{insert_time * 1e6:>12.2f} {remove_time * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Maze load time with the old reload-and-retry star loop vs single-pass
+# sampling, across percent_star values.
+# Usage: python benchmarks/bench_star_placement.py [maze file] [minimum_star]
+import os
+import sys
+import random
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from maze_grid import MazeGrid, PATH, STAR, place_stars_sampled
+
+PERCENTS = [1, 2, 5, 10, 25, 50]
+REPEATS = 20
+MAX_PASSES = 2000  # Give up on the retry loop past this many reloads
+
+
+def load_retry(path, percent, minimum, rng):
+    # The old get_maze(): reload the file and reroll until enough stars
+    passes = 0
+    stars = 0
+    while stars < minimum and passes < MAX_PASSES:
+        passes += 1
+        grid = MazeGrid.load(path)
+        stars = 0
+        for i in grid.positions(PATH):
+            if rng.randint(1, 100) in range(1, percent + 1):
+                grid.cells[i] = STAR
+                stars += 1
+    return passes
+
+
+def load_sampled(path, percent, minimum, rng):
+    grid = MazeGrid.load(path)
+    place_stars_sampled(grid, percent, minimum, rng)
+    return 1
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "maze.txt")
+    minimum = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    open_cells = MazeGrid.load(path).count(PATH)
+    print(f"{path}: {open_cells} open cells, minimum_star={minimum}")
+    print(f"{'percent':>8} {'retry (ms)':>11} {'passes':>7} {'sample (ms)':>12} {'speedup':>8}")
+    print(f"(+ = retry loop gave up after {MAX_PASSES} reloads)")
+
+    rng = random.Random(0)
+    for percent in PERCENTS:
+        results = {}
+        for name, loader in (("retry", load_retry), ("sample", load_sampled)):
+            passes = 0
+            start = time.perf_counter()
+            repeats = REPEATS if name == "sample" else max(1, REPEATS // 10)
+            for _ in range(repeats):
+                passes += loader(path, percent, minimum, rng)
+            results[name] = ((time.perf_counter() - start) / repeats * 1000, passes / repeats)
+
+        retry_ms, retry_passes = results["retry"]
+        sample_ms, _ = results["sample"]
+        capped = "+" if retry_passes >= MAX_PASSES else " "
+        print(f"{percent:>8} {retry_ms:>11.2f} {retry_passes:>6.1f}{capped} {sample_ms:>12.2f} "
+              f"{retry_ms / sample_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
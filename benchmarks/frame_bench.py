@@ -0,0 +1,259 @@
+# Frame-time benchmark for every game, run off-screen through headless.py.
+# Usage: python benchmarks/frame_bench.py [scenario ...] [--replay PATH] [--save] [--threshold 0.25]
+# Each scenario plays a game with scripted input and draws every frame.
+# update() and draw() are timed separately ("frame" is the two together).
+# The mini-games run on the game clock (gameclock.py), so their timers,
+# tweens and each_tick callbacks run inside update() and are counted in
+# update and frame times. Callbacks on pgzero's own clock (the maze's, and
+# anything a game still schedules there) are not included. It reports
+# p50/p95/p99 in ms. A second pass under tracemalloc reports how much each
+# frame allocates and how much memory is still held at the end.
+# --save writes the results as the baseline. Later runs compare against it
+# and exit with status 1 if any scenario's p50 or p95 frame time or its
+# allocation per frame is more than `threshold` above the baseline.
+# Baselines depend on the machine, so they live in build/ and aren't committed.
+# --replay PATH adds a session recorded with replay.py as a scenario.
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+# Bound now: headless.py swaps time.perf_counter for the simulated clock
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import headless
+import replay
+
+BASELINE_FILE = os.path.join(ROOT, "build", "frame_baseline.json")
+THRESHOLD = 0.25  # Allowed slowdown before a run counts as a regression
+SEED = 1
+
+
+# --- SCENARIOS ---
+# name -> script, frames to collect, and optional setup/events/until hooks
+# or "session" (run_session arguments, e.g. from a recording). Games that
+# end early are started again until enough frames are collected.
+
+def maze_walk_setup(module):
+    module.dev_mode = True
+    module.auto_walk = True
+
+
+def maze_walk_events(frame, module):
+    return [{"type": "key_down", "key": "n"}] if module.game_state == "prompt" else ()
+
+
+def maze_redraw_events(frame, module):
+    module.maze_layer.chunks.clear()  # Every chunk is rendered again in draw()
+    return ()
+
+
+def maze_done(module):
+    return module.game_state in ("win", "gameover")
+
+
+def garden_setup(module):
+    module.char.pos = (-1000, -1000)  # Out of the fangflowers' way
+    module.WIN_TIME = 10 ** 6
+    for _ in range(150):
+        module.new_flower()
+    for _ in range(40):
+        module.mutate()
+
+
+def garden_swarm_setup(module):
+    # Hard mode: one mutation brings up a swarm of fangflowers
+    garden_setup(module)
+    module.FANGFLOWERS_PER_MUTATION = 2000
+    module.mutate()
+
+
+def balloon_events(frame, module):
+    if frame % 40 == 0:
+        return [{"type": "mouse_down", "pos": [400, 300]}]
+    if frame % 40 == 15:
+        return [{"type": "mouse_up", "pos": [400, 300]}]
+    return ()
+
+
+def dragons_events(frame, module):
+    key = ("right", "down", "left", "up")[frame // 60 % 4]
+    if frame % 60 == 0:
+        return [{"type": "key_up", "key": k} for k in ("right", "down", "left", "up")] + \
+               [{"type": "key_down", "key": key}]
+    return ()
+
+
+def shoot_events(frame, module):
+    if frame % 20 == 0:
+        x, y = module.fruit_pos[frame // 20 % len(module.fruits)]
+        return [{"type": "mouse_down", "pos": [int(x), int(y)]}]
+    return ()
+
+
+def shoot_many_setup(module):
+    module.FRUIT_COUNT = 500
+    module.WIN_TARGET = 10 ** 6
+    module.place_fruits()
+
+
+def red_final_setup(module):
+    module.current_level = module.FINAL_LEVEL
+    module.init_level()
+
+
+def red_swarm_setup(module):
+    # A level far past the last one: hundreds of stars shuffling at once
+    module.FINAL_LEVEL = 10 ** 6
+    module.current_level = 300
+    module.init_level()
+
+
+SCENARIOS = {
+    "maze_walk": {"script": "maze_game.py", "frames": 600, "setup": maze_walk_setup,
+                  "events": maze_walk_events, "until": maze_done},
+    "maze_full_redraw": {"script": "maze_game.py", "frames": 300, "events": maze_redraw_events},
+    "garden_crowded": {"script": "garden.py", "frames": 600, "setup": garden_setup},
+    "garden_swarm": {"script": "garden.py", "frames": 300, "setup": garden_swarm_setup},
+    "balloon": {"script": "balloon.py", "frames": 600, "events": balloon_events},
+    "dragons": {"script": "dragons.py", "frames": 600, "events": dragons_events},
+    "shoot": {"script": "shoot.py", "frames": 600, "events": shoot_events},
+    "shoot_many": {"script": "shoot.py", "frames": 600, "setup": shoot_many_setup, "events": shoot_events},
+    "red_final_level": {"script": "red.py", "frames": 600, "setup": red_final_setup},
+    "red_swarm": {"script": "red.py", "frames": 600, "setup": red_swarm_setup},
+}
+
+
+# --- MEASURING ---
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def play(scenario, trace_memory):
+    # Returns per-frame update/draw times and per-frame allocation peaks
+    samples = {"update": [], "draw": [], "alloc": []}
+
+    def setup(module):
+        if scenario.get("setup"):
+            scenario["setup"](module)
+        update, draw = getattr(module, "update", None), module.draw
+        takes_dt = update is not None and update.__code__.co_argcount > 0
+
+        def timed_update(dt):
+            if trace_memory:
+                tracemalloc.reset_peak()
+                samples["before"] = tracemalloc.get_traced_memory()[0]
+            start = perf_counter()
+            if update is not None:
+                update(dt) if takes_dt else update()
+            samples["update"].append(perf_counter() - start)
+
+        def timed_draw():
+            start = perf_counter()
+            draw()
+            samples["draw"].append(perf_counter() - start)
+            if trace_memory:
+                samples["alloc"].append(tracemalloc.get_traced_memory()[1] - samples["before"])
+
+        module.update = timed_update
+        module.draw = timed_draw
+
+    if trace_memory:
+        tracemalloc.start()
+    seed = SEED
+    try:
+        while len(samples["draw"]) < scenario["frames"]:
+            options = {"events": scenario.get("events"), "seed": seed, "until": scenario.get("until")}
+            options.update(scenario.get("session", {}))
+            options["frames"] = scenario["frames"] - len(samples["draw"])
+            headless.run_session(scenario["script"], draw_every=1, setup=setup, **options)
+            seed += 1
+        retained = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return samples, retained
+
+
+def measure(scenario):
+    times, _ = play(scenario, trace_memory=False)
+    memory, retained = play(scenario, trace_memory=True)
+
+    frames = [u + d for u, d in zip(times["update"], times["draw"])]
+    result = {"frames": len(frames)}
+    for name, values in (("frame", frames), ("update", times["update"]), ("draw", times["draw"])):
+        ordered = sorted(values)
+        for p in (50, 95, 99):
+            result[f"{name}_p{p}_ms"] = round(percentile(ordered, p / 100) * 1000, 3)
+    result["alloc_kb_per_frame"] = round(sum(memory["alloc"]) / len(memory["alloc"]) / 1024, 1)
+    result["retained_kb"] = round(retained / 1024, 1)
+    return result
+
+
+def read_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def regressions(results, baseline, threshold):
+    failed = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("frame_p50_ms", "frame_p95_ms", "alloc_kb_per_frame"):
+            if result[metric] > base[metric] * (1 + threshold):
+                failed.append(f"{name}: {metric} {base[metric]} -> {result[metric]}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-game frame-time benchmark.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--replay", action="append", default=[], help="recording from replay.py to add as a scenario")
+    parser.add_argument("--save", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    names = args.scenarios or ([] if args.replay else list(SCENARIOS))
+    for path in args.replay:
+        recording = replay.load(path)
+        name = "replay:" + os.path.splitext(os.path.basename(path))[0]
+        SCENARIOS[name] = {"script": recording["script"], "frames": len(recording["dts"]),
+                           "session": replay.session_options(recording)}
+        names.append(name)
+
+    results = {}
+    print(f"{'scenario':>18} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'draw p95':>9} "
+          f"{'upd p95':>9} {'KB/frame':>9}")
+    for name in names:
+        result = results[name] = measure(SCENARIOS[name])
+        print(f"{name:>18} {result['frame_p50_ms']:>9.3f} {result['frame_p95_ms']:>9.3f} "
+              f"{result['frame_p99_ms']:>9.3f} {result['draw_p95_ms']:>9.3f} {result['update_p95_ms']:>9.3f} "
+              f"{result['alloc_kb_per_frame']:>9.1f}")
+
+    if args.save:
+        baseline = read_baseline(args.baseline)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    failed = regressions(results, read_baseline(args.baseline), args.threshold)
+    for line in failed:
+        print("REGRESSION", line)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
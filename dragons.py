@@ -1,16 +1,18 @@
 import os
-import sys
-import time
 from random import randint
 import pgzrun
 from pgzero.actor import Actor
+import atlas
+import minigame
+from text_cache import Label, draw_text
 
 os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
 
+atlas.install()  # Images are drawn from the sprite atlas
+
 # --- CONFIGURATION ---
 WIDTH = 800
 HEIGHT = 600
-RESULT_FILE = "results.txt"
 EGG_TARGET = 20
 MOVE_DISTANCE = 5
 
@@ -19,10 +21,15 @@ lives = 3
 eggs_collected = 0
 game_over = False
 game_complete = False
+result_saved = False
 
 hero = Actor("hero", pos=(200, 300))
 lairs = []
 
+# HUD
+lives_label = Label("Lives: {}", topleft=(10, 10), fontsize=40, color="black")
+eggs_label = Label("Eggs: {}/{}", topright=(WIDTH - 10, 10), fontsize=40, color="black")
+
 
 def draw():
     screen.clear()
@@ -35,13 +42,13 @@ def draw():
             lair["eggs"].draw()
 
     # HUD
-    screen.draw.text(f"Lives: {lives}", topleft=(10, 10), fontsize=40, color="black")
-    screen.draw.text(f"Eggs: {eggs_collected}/{EGG_TARGET}", topright=(WIDTH - 10, 10), fontsize=40, color="black")
+    lives_label.draw(screen, lives)
+    eggs_label.draw(screen, eggs_collected, EGG_TARGET)
 
     if game_over:
-        screen.draw.text("GAME OVER", center=(WIDTH / 2, HEIGHT / 2), fontsize=80, color="red")
+        draw_text(screen, "GAME OVER", center=(WIDTH / 2, HEIGHT / 2), fontsize=80, color="red")
     if game_complete:
-        screen.draw.text("YOU WIN!", center=(WIDTH / 2, HEIGHT / 2), fontsize=80, color="green")
+        draw_text(screen, "YOU WIN!", center=(WIDTH / 2, HEIGHT / 2), fontsize=80, color="green")
 
 
 def update():
@@ -131,11 +138,13 @@ def check_lairs():
 
 
 def handle_game_end(result):
-    draw()
-    with open(RESULT_FILE, "w") as f:
-        f.write(result)
-    time.sleep(1.5)
-    sys.exit()
+    global result_saved
+    if result_saved:
+        return
+    result_saved = True
+
+    # Leave the end screen up for a moment before closing
+    minigame.finish(result, 1.5, score=eggs_collected)
 
 
 # --- MUSIC ---
@@ -146,4 +155,5 @@ except Exception:
     pass
 
 make_lairs()
+minigame.begin(globals())
 pgzrun.go()
\ No newline at end of file
@@ -0,0 +1,177 @@
+# Game time and timers that can be paused, sped up, slowed down and stepped.
+# pgzero's clock runs on real frame time and can't be stopped, and games
+# that also read time.time() drift away from it when frames are dropped.
+# Games use this clock instead:
+#   from gameclock import clock, animate
+#   clock.schedule(wilt_flower, 3)   # Same calls as pgzero's clock
+#   started = clock.time()           # Game seconds, not wall-clock seconds
+# minigame.begin() hands the game's update() to run_update(), which runs it
+# as often as the clock says: not at all while paused, once per step(),
+# every other frame at scale 0.5 and twice per frame at scale 2. Game time,
+# timers and tweens move forward with each run, so everything in the game
+# stays in step. Timers fire in order, each with clock.time() reading the
+# time it was due. A long frame catches up on every interval it missed, so
+# a slow or headless run sees the same game a 60 FPS one would.
+# Keys (any game): F5 pause/resume, F6 step one frame, F7/F8 slower/faster.
+import heapq
+import itertools
+
+from pgzero.animation import Animation
+from pgzero.clock import clock as pgzero_clock
+from pgzero.constants import keys
+
+PAUSE_KEY = keys.F5
+STEP_KEY = keys.F6
+SLOWER_KEY = keys.F7
+FASTER_KEY = keys.F8
+SCALES = [0.25, 0.5, 1, 2, 4, 8]  # Speeds F7/F8 move between
+
+
+class GameClock:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.t = 0.0
+        self.paused = False
+        self.scale = 1
+        self.steps = 0  # Frames step() has asked for while paused
+        self.budget = 0.0  # Fraction of a frame owed at scales below 1
+        self.queue = []  # [due, count, callback, interval or None], soonest first
+        self.ticks = []  # Called with dt every game frame
+        self.count = itertools.count()  # Keeps equal due times in the order scheduled
+
+    def time(self):
+        return self.t
+
+    # --- TIMERS (same calls as pgzero's clock) ---
+    def schedule(self, callback, delay):
+        heapq.heappush(self.queue, [self.t + delay, next(self.count), callback, None])
+
+    def schedule_unique(self, callback, delay):
+        self.unschedule(callback)
+        self.schedule(callback, delay)
+
+    def schedule_interval(self, callback, delay):
+        heapq.heappush(self.queue, [self.t + delay, next(self.count), callback, delay])
+
+    def unschedule(self, callback):
+        queue = [entry for entry in self.queue if entry[2] != callback]
+        if len(queue) != len(self.queue):
+            heapq.heapify(queue)
+            self.queue = queue
+        self.ticks = [tick for tick in self.ticks if tick != callback]
+
+    def each_tick(self, callback):
+        self.ticks.append(callback)
+
+    # --- RUNNING ---
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self.steps = 0
+
+    def step(self, frames=1):
+        # Pause and run `frames` more frames
+        self.paused = True
+        self.steps += frames
+
+    def frames(self):
+        # How many game frames to run for this real one
+        if self.paused:
+            frames, self.steps = self.steps, 0
+            return frames
+        self.budget += self.scale
+        frames = int(self.budget)
+        self.budget -= frames
+        return frames
+
+    def advance(self, dt):
+        # Move game time on by dt: tweens and each_tick callbacks first, as
+        # pgzero does, then every timer that came due, in order
+        end = self.t + dt
+        for tick in list(self.ticks):
+            tick(dt)
+        while self.queue and self.queue[0][0] <= end:
+            entry = heapq.heappop(self.queue)
+            due, _, callback, interval = entry
+            self.t = due
+            if interval is not None:
+                heapq.heappush(self.queue, [due + interval, next(self.count), callback, interval])
+            callback()
+        self.t = end
+
+
+clock = GameClock()
+
+
+class Tween(Animation):
+    # pgzero's Animation, moved on by the game clock instead of pgzero's
+    def __init__(self, object, tween='linear', duration=1, on_finished=None, **targets):
+        super().__init__(object, tween, duration, on_finished, **targets)
+        pgzero_clock.unschedule(self.update)
+        clock.each_tick(self.update)
+
+    def update(self, dt):
+        if self.running:  # May have been stopped earlier in the same tick
+            super().update(dt)
+
+    def stop(self, complete=False):
+        super().stop(complete)
+        clock.unschedule(self.update)
+
+
+def animate(object, tween='linear', duration=1, on_finished=None, **targets):
+    return Tween(object, tween, duration, on_finished, **targets)
+
+
+def run_update(update, dt):
+    # Call a game's update() for each game frame due this real frame
+    takes_dt = "dt" in update.__code__.co_varnames[:update.__code__.co_argcount]
+    for _ in range(clock.frames()):
+        clock.advance(dt)
+        if takes_dt:
+            update(dt)
+        else:
+            update()
+
+
+def control_keys(key):
+    # Handle the clock's keys; True if key was one of them
+    if key == PAUSE_KEY:
+        if clock.paused:
+            clock.resume()
+        else:
+            clock.pause()
+    elif key == STEP_KEY:
+        clock.step()
+    elif key in (SLOWER_KEY, FASTER_KEY):
+        scales = sorted(set(SCALES + [clock.scale]))
+        index = scales.index(clock.scale) + (1 if key == FASTER_KEY else -1)
+        clock.scale = scales[max(0, min(len(scales) - 1, index))]
+    else:
+        return False
+    return True
+
+
+def install(namespace):
+    # Put a game's update() and on_key_down() under the clock. Call it
+    # before pgzrun.go(), which is when pgzero picks them up.
+    update = namespace.get('update')
+    if update is not None:
+        def update_on_clock(dt):
+            run_update(update, dt)
+        update_on_clock.__wrapped__ = update
+        namespace['update'] = update_on_clock
+
+    handler = namespace.get('on_key_down')
+    params = handler.__code__.co_varnames[:handler.__code__.co_argcount] if handler else ()
+
+    def on_key_down(key, mod=0, unicode=''):
+        if control_keys(key) or not handler:
+            return None
+        event = {'key': key, 'mod': mod, 'unicode': unicode}
+        return handler(**{param: event[param] for param in params if param in event})
+    namespace['on_key_down'] = on_key_down
@@ -1,20 +1,29 @@
-import time
+import heapq
+import itertools
 from random import randint
 import os
-import sys
 
 os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
+import numpy as np
 import pgzrun
 from pgzero.actor import Actor
+import atlas
+import minigame
+from gameclock import clock
+from spatial_hash import SpatialHash
+from text_cache import Label, draw_text
+
+atlas.install()  # Images are drawn from the sprite atlas
 
 # --- CONFIGURATION ---
 WIDTH = 800
 HEIGHT = 600
 CENTER_X = WIDTH / 2
 CENTER_Y = HEIGHT / 2
-RESULT_FILE = "results.txt"
 WIN_TIME = 30  # Seconds to survive to win
 RAIN_CHANCE = 2
+WILT_TIME = 10  # Seconds a flower can stay wilted before the garden is unhappy
+FANGFLOWERS_PER_MUTATION = 1  # Hard mode: hundreds, the extra ones spring up all over the garden
 # --- VARIABLES ---
 game_over = False
 game_won = False
@@ -22,7 +31,7 @@ result_written = False
 garden_happy = True
 raining = False
 time_elapsed = 0
-start_time = time.time()
+start_time = clock.time()
 
 # Character Setup
 rand_char = randint(1, 2)
@@ -34,10 +43,19 @@ char.pos = 100, 500
 
 # Lists
 flower_list = []
-wilted_list = []
+wilted = {}  # Wilted flower -> clock.time() it wilted
+wilt_heap = []  # (time wilted, count, flower), longest wilted first; stale entries are skipped
+wilt_count = itertools.count()  # Breaks ties in wilt_heap without comparing Actors
+flower_hash = SpatialHash()  # Where the flowers are, so watering only checks the ones nearby
+
+# Fangflowers: one row each in the position and velocity arrays, so they all
+# move and bounce in one step; the Actors are only moved there to be drawn
 fangflower_list = []
-fangflower_vy_list = []
-fangflower_vx_list = []
+fangflower_pos = np.empty((0, 2))
+fangflower_vel = np.empty((0, 2))
+fangflower_half = np.array(Actor("fangflower").size) / 2
+
+happy_label = Label("Garden happy for: {} seconds", topleft=(10, 10), color="black", fontsize=30)
 
 
 def draw():
@@ -54,36 +72,29 @@ def draw():
     char.draw()
     for flower in flower_list:
         flower.draw()
-    for fangflower in fangflower_list:
+    for fangflower, pos in zip(fangflower_list, fangflower_pos.tolist()):
+        fangflower.pos = pos
         fangflower.draw()
 
-    # Calculate time
-    if not game_over:
-        current_time = int(time.time() - start_time)
-        time_elapsed = current_time
-
     # UI Text
-    screen.draw.text(
-        f"Garden happy for: {time_elapsed} seconds",
-        topleft=(10, 10), color="black", fontsize=30
-    )
+    happy_label.draw(screen, time_elapsed)
 
     if game_over:
         if game_won:
-            screen.draw.text(
-                "GARDEN SAFE - YOU WIN!",
+            draw_text(
+                screen, "GARDEN SAFE - YOU WIN!",
                 center=(CENTER_X, CENTER_Y),
                 fontsize=60, color="green", owidth=1.5, ocolor="black"
             )
         elif not garden_happy:
-            screen.draw.text(
-                "GARDEN UNHAPPY!",
+            draw_text(
+                screen, "GARDEN UNHAPPY!",
                 center=(CENTER_X, CENTER_Y),
                 fontsize=60, color="red", owidth=1.5, ocolor="black"
             )
         else:
-            screen.draw.text(
-                "FANGFLOWER ATTACK!",
+            draw_text(
+                screen, "FANGFLOWER ATTACK!",
                 center=(CENTER_X, CENTER_Y),
                 fontsize=60, color="red", owidth=1.5, ocolor="black"
             )
@@ -96,10 +107,11 @@ def update():
         return
 
     # Check Win Condition
-    current_time = int(time.time() - start_time)
+    current_time = int(clock.time() - start_time)
     if current_time >= WIN_TIME:
         game_over = True
         game_won = True
+        time_elapsed = min(current_time, WIN_TIME)  # The score, and what the end screen shows
         handle_game_end("WIN")
         return
 
@@ -129,6 +141,10 @@ def update():
 
         update_fangflowers()
 
+    # Calculate time (here rather than in draw(), which headless runs may skip)
+    if not game_over:
+        time_elapsed = current_time
+
 
 def handle_game_end(result):
     global result_written
@@ -136,9 +152,7 @@ def handle_game_end(result):
         return
     result_written = True
 
-    with open(RESULT_FILE, "w") as f:
-        f.write(result)
-    clock.schedule_unique(sys.exit, 2.0)
+    minigame.finish(result, 2.0, score=time_elapsed)
 
 
 def check_rain():
@@ -150,12 +164,13 @@ def check_rain():
 
 
 def start_rain():
-    global raining, flower_list, wilted_list
+    global raining, flower_list
     raining = True
 
-    for i in range(len(flower_list)):
-        flower_list[i].image = "flower"
-        wilted_list[i] = "happy"
+    for flower in flower_list:
+        flower.image = "flower"
+    wilted.clear()
+    wilt_heap.clear()
 
     clock.schedule(stop_rain, 1.0)
 
@@ -169,7 +184,7 @@ def new_flower():
     flower_new = Actor("flower")
     flower_new.pos = randint(50, WIDTH - 50), randint(150, HEIGHT - 100)
     flower_list.append(flower_new)
-    wilted_list.append("happy")
+    flower_hash.insert(flower_new, flower_new)
 
 
 def add_flowers():
@@ -180,47 +195,50 @@ def add_flowers():
 
 def check_wilt_times():
     global garden_happy, game_over
-    if wilted_list and not game_over:
-        for wilted_since in wilted_list:
-            if not wilted_since == "happy":
-                time_wilted = int(time.time() - wilted_since)
-                if time_wilted > 10.0:
-                    garden_happy = False
-                    game_over = True
-                    handle_game_end("LOSS")
-                    break
+    # Only the flower that has been wilted longest can have run out of time
+    while wilt_heap and wilted.get(wilt_heap[0][2]) != wilt_heap[0][0]:
+        heapq.heappop(wilt_heap)  # Watered, rained on or mutated since
+    if wilt_heap and not game_over:
+        time_wilted = int(clock.time() - wilt_heap[0][0])
+        if time_wilted > WILT_TIME:
+            garden_happy = False
+            game_over = True
+            handle_game_end("LOSS")
 
 
 def wilt_flower():
-    global flower_list, wilted_list
+    global flower_list
     if not game_over:
         if flower_list:
             rand_flower = randint(0, len(flower_list) - 1)
             # Only wilt if it is not currently raining
             if flower_list[rand_flower].image == "flower" and not raining:
-                flower_list[rand_flower].image = "flower-wilt"
-                wilted_list[rand_flower] = time.time()
+                flower = flower_list[rand_flower]
+                flower.image = "flower-wilt"
+                wilted[flower] = clock.time()
+                heapq.heappush(wilt_heap, (wilted[flower], next(wilt_count), flower))
         clock.schedule(wilt_flower, 3)
 
 
 def check_flower_collision():
-    index = 0
-    for flower in flower_list:
-        if flower.colliderect(char) and flower.image == "flower-wilt":
-            flower.image = "flower"
-            wilted_list[index] = "happy"
-            break
-        index = index + 1
+    hits = [flower for flower in flower_hash.query(char)
+            if flower.colliderect(char) and flower.image == "flower-wilt"]
+    if hits:
+        flower = min(hits, key=flower_list.index)  # The one a scan of flower_list finds first
+        flower.image = "flower"
+        del wilted[flower]
 
 
 def check_fangflower_collision():
     global game_over
-    for fangflower in fangflower_list:
-        if fangflower.colliderect(char):
-            char.image = "zap"
-            game_over = True
-            handle_game_end("LOSS")
-            break
+    # Same overlap test as Actor.colliderect(), for every fangflower at once
+    low = fangflower_pos - fangflower_half
+    high = fangflower_pos + fangflower_half
+    hits = (low[:, 0] < char.right) & (high[:, 0] > char.left) & (low[:, 1] < char.bottom) & (high[:, 1] > char.top)
+    if hits.any():
+        char.image = "zap"
+        game_over = True
+        handle_game_end("LOSS")
 
 
 def velocity():
@@ -235,37 +253,35 @@ def velocity():
 def mutate():
     if not game_over and flower_list:
         rand_flower = randint(0, len(flower_list) - 1)
-        fangflower_pos_x = flower_list[rand_flower].x
-        fangflower_pos_y = flower_list[rand_flower].y
+        positions = [flower_list[rand_flower].pos]
+        flower_hash.remove(flower_list[rand_flower])
+        wilted.pop(flower_list[rand_flower], None)  # A fangflower can't be watered any more
         del flower_list[rand_flower]
-        fangflower = Actor("fangflower")
-        fangflower.pos = fangflower_pos_x, fangflower_pos_y
-        fangflower_vx = velocity()
-        fangflower_vy = velocity()
-        fangflower_list.append(fangflower)
-        fangflower_vx_list.append(fangflower_vx)
-        fangflower_vy_list.append(fangflower_vy)
+        for _ in range(FANGFLOWERS_PER_MUTATION - 1):
+            positions.append((randint(50, WIDTH - 50), randint(150, HEIGHT - 100)))
+        add_fangflowers(positions)
         clock.schedule(mutate, 20)
 
 
+def add_fangflowers(positions):
+    global fangflower_pos, fangflower_vel
+    velocities = []
+    for pos in positions:
+        fangflower_list.append(Actor("fangflower", pos=pos))
+        velocities.append((velocity(), velocity()))
+    fangflower_pos = np.concatenate((fangflower_pos, np.array(positions, dtype=float)))
+    fangflower_vel = np.concatenate((fangflower_vel, np.array(velocities, dtype=float)))
+
+
 def update_fangflowers():
-    global raining
+    global raining, fangflower_pos
     if not game_over and not raining:
-        index = 0
-        for fangflower in fangflower_list:
-            fangflower_vx = fangflower_vx_list[index]
-            fangflower_vy = fangflower_vy_list[index]
-            fangflower.x = fangflower.x + fangflower_vx
-            fangflower.y = fangflower.y + fangflower_vy
-            if fangflower.left < 0:
-                fangflower_vx_list[index] = -fangflower_vx
-            if fangflower.right > WIDTH:
-                fangflower_vx_list[index] = -fangflower_vx
-            if fangflower.top < 150:
-                fangflower_vy_list[index] = -fangflower_vy
-            if fangflower.bottom > HEIGHT:
-                fangflower_vy_list[index] = -fangflower_vy
-            index = index + 1
+        fangflower_pos += fangflower_vel
+        low = fangflower_pos - fangflower_half
+        high = fangflower_pos + fangflower_half
+        # Bounce off the sides, the top of the flower bed (y=150) and the bottom
+        fangflower_vel[(low[:, 0] < 0) | (high[:, 0] > WIDTH), 0] *= -1
+        fangflower_vel[(low[:, 1] < 150) | (high[:, 1] > HEIGHT), 1] *= -1
 
 
 def reset_char():
@@ -281,4 +297,5 @@ add_flowers()
 wilt_flower()
 check_rain()  # Start the rain checker
 
+minigame.begin(globals())
 pgzrun.go()
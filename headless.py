@@ -0,0 +1,267 @@
+# Headless, uncapped runner for the games.
+# Runs a game on SDL's dummy video and audio drivers with a simulated clock.
+# Every frame moves pgzero's clock and the patched time.time()/perf_counter()
+# forward by dt (fixed, or one value per frame when replaying a recording,
+# see replay.py). update() is then called straight away instead of waiting
+# for the next vsync; it moves the game clock (gameclock.py) on with it, and
+# --time-scale N runs N game frames per frame. Input
+# comes from a script instead of the keyboard and mouse, and draw() (and
+# the flip after it) is skipped or only run every Nth frame. Each session
+# loads the game fresh through MiniGameHost, so the result still arrives via
+# minigame.finish().
+#   python headless.py garden.py [--sessions N] [--frames N] [--dt SECONDS]
+#                      [--draw-every N] [--events events.json] [--seed N]
+#                      [--time-scale N]
+# An events file is a JSON list of [frame, event] pairs, for example
+#   [[0, {"type": "key_down", "key": "space"}],
+#    [30, {"type": "mouse_down", "pos": [400, 300], "button": 1}]]
+# The window must not have been opened by anything else first.
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+import pgzero.game
+from pgzero import loaders
+from pgzero.animation import Animation
+from pgzero.clock import clock
+from pgzero.constants import keys
+from pgzero.keyboard import keyboard
+from pgzero.screen import Screen
+
+import gameclock
+from minigame_host import MiniGameHost
+import results_store
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+DT = 1 / 60  # Simulated seconds per frame
+MAX_FRAMES = 60 * 60 * 5  # Give up on a session after 5 simulated minutes
+
+dummy = True  # Use SDL's dummy drivers; replay.py turns this off to record in a real window
+host = None  # Shared so compiled game code is reused between sessions
+
+results_store.enabled = False  # Scripted sessions aren't real play
+
+
+class SimTime:
+    # Stands in for the time module's clocks while a session runs
+    def __init__(self, now=None):
+        self.now = time.time() if now is None else now
+        self.mouse_pos = (0, 0)
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def get_pos(self):
+        return self.mouse_pos
+
+
+@contextlib.contextmanager
+def simulated(sim):
+    patches = [(time, 'time', sim.time), (time, 'perf_counter', sim.time), (time, 'monotonic', sim.time),
+               (time, 'sleep', sim.sleep), (pygame.mouse, 'get_pos', sim.get_pos)]
+    saved = [(owner, name, getattr(owner, name)) for owner, name, _ in patches]
+    for owner, name, value in patches:
+        setattr(owner, name, value)
+    try:
+        yield sim
+    finally:
+        for owner, name, value in saved:
+            setattr(owner, name, value)
+
+
+def open_display():
+    # Open the (invisible) window once per process
+    global host
+    if host is None:
+        if dummy:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.init()
+        pygame.display.set_mode((800, 600))
+        loaders.set_root(GAME_DIR)
+        os.chdir(GAME_DIR)  # Games open files like maze.txt relative to themselves
+        host = MiniGameHost(GAME_DIR)
+    return host
+
+
+def reset_clock():
+    # Nothing from one session may fire in the next
+    clock.t = 0
+    clock.events = []
+    clock._each_tick = []
+    for anim in list(Animation.animations):
+        anim.stop()
+    gameclock.clock.reset()
+    keyboard._pressed.clear()
+
+
+def make_event(spec, sim):
+    # Turn a scripted event dict into the pygame event the real loop would see
+    kind = spec['type']
+    if kind in ('key_down', 'key_up'):
+        key = keys[spec['key'].upper()].value
+        if kind == 'key_down':
+            keyboard._press(key)
+            return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='')
+        keyboard._release(key)
+        return pygame.event.Event(pygame.KEYUP, key=key, mod=0)
+
+    sim.mouse_pos = tuple(spec.get('pos', sim.mouse_pos))
+    if kind == 'mouse_move':
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=sim.mouse_pos, rel=tuple(spec.get('rel', (0, 0))),
+                                  buttons=tuple(spec.get('buttons', (0, 0, 0))))
+    event_type = pygame.MOUSEBUTTONDOWN if kind == 'mouse_down' else pygame.MOUSEBUTTONUP
+    return pygame.event.Event(event_type, pos=sim.mouse_pos, button=spec.get('button', 1))
+
+
+def frame_events(events):
+    # events is a list of [frame, event] pairs or a function
+    # events(frame, module) returning the event dicts for that frame
+    if events is None or callable(events):
+        return events
+    by_frame = {}
+    for frame, spec in events:
+        by_frame.setdefault(frame, []).append(spec)
+    return lambda frame, module: by_frame.get(frame, ())
+
+
+def frame_dts(dt):
+    # dt is seconds per frame, a list with one value per frame, or a
+    # function dt(frame)
+    if callable(dt):
+        return dt
+    if isinstance(dt, (list, tuple)):
+        return dt.__getitem__
+    return lambda frame: dt
+
+
+def fit_window(module):
+    # Follow WIDTH/HEIGHT changes (maze_game.py resizes for mini-games)
+    size = getattr(module, 'WIDTH', 800), getattr(module, 'HEIGHT', 600)
+    if pygame.display.get_surface().get_size() != size:
+        module.screen.surface = pygame.display.set_mode(size)
+    pgzero.game.screen = module.screen.surface  # Actor.draw() blits here
+
+
+def run_session(script, events=None, frames=MAX_FRAMES, dt=DT, draw_every=0, seed=None, until=None, setup=None,
+                start_time=None, time_scale=1):
+    # Play one session of `script`. setup(module) runs once the game is
+    # loaded, before the first frame. until(module) can end it early (for
+    # games like maze_game.py that never report a result). start_time is
+    # what time.time() reads at the start (now, by default). time_scale is
+    # the game clock's speed.
+    host = open_display()
+    events = frame_events(events)
+    dts = frame_dts(dt)
+    if isinstance(dt, (list, tuple)):
+        frames = min(frames, len(dt))
+    if seed is not None:
+        random.seed(seed)
+    reset_clock()
+    gameclock.clock.scale = time_scale
+
+    sim = SimTime(start_time)
+    sim_start = sim.now
+    results = []
+    exited = False
+    frame = 0
+    wall_start = time.perf_counter()
+
+    with simulated(sim):
+        try:
+            host.start({'file': script}, Screen(pygame.display.get_surface()), results.append)
+            module = host.module
+            fit_window(module)
+            if setup:
+                setup(module)
+
+            game = pgzero.game.PGZeroGame(module)
+            game.load_handlers()
+            update = game.get_update_func()
+            draw = game.get_draw_func()
+
+            while frame < frames:
+                for spec in (events(frame, module) if events else ()):
+                    game.dispatch_event(make_event(spec, sim))
+
+                step = dts(frame)
+                sim.now += step
+                clock.tick(step)
+                if update:
+                    update(step)
+                if draw_every and frame % draw_every == 0:
+                    fit_window(module)
+                    draw()
+                    pygame.display.flip()  # As pgzero does; latency.py times inputs to here
+                frame += 1
+
+                # The end screen is only for players; stop once there's a result
+                if host.result is not None or (until and until(module)):
+                    break
+        except SystemExit:
+            exited = True
+        finally:
+            if host.running:
+                clock.unschedule(host.stop)
+                host.stop()
+            reset_clock()
+
+    return {
+        "script": script,
+        "result": results[-1] if results else None,
+        "frames": frame,
+        "sim_time": round(sim.now - sim_start, 3),
+        "wall_time": round(time.perf_counter() - wall_start, 4),
+        "exited": exited,
+    }
+
+
+def run_batch(script, sessions, seed=0, **options):
+    # Session i is seeded with seed + i, so a batch is repeatable
+    return [run_session(script, seed=seed + i, **options) for i in range(sessions)]
+
+
+def summarize(sessions, wall_time):
+    outcomes = {}
+    for session in sessions:
+        outcome = session["result"]["outcome"] if session["result"] else "NONE"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    frames = sum(session["frames"] for session in sessions)
+    return {
+        "sessions": len(sessions),
+        "outcomes": outcomes,
+        "mean_frames": round(frames / len(sessions), 1) if sessions else 0,
+        "sessions_per_minute": round(len(sessions) / wall_time * 60) if wall_time else 0,
+        "frames_per_second": round(frames / wall_time) if wall_time else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a game without a window or frame cap.")
+    parser.add_argument("script")
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=MAX_FRAMES, help="frame limit per session")
+    parser.add_argument("--dt", type=float, default=DT, help="simulated seconds per frame")
+    parser.add_argument("--draw-every", type=int, default=0, help="call draw() every N frames (0 = never)")
+    parser.add_argument("--events", help="JSON file of [frame, event] pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-scale", type=float, default=1, help="game frames run per frame")
+    args = parser.parse_args()
+
+    events = None
+    if args.events:
+        with open(args.events) as f:
+            events = json.load(f)
+
+    start = time.perf_counter()
+    sessions = run_batch(args.script, args.sessions, seed=args.seed, events=events, frames=args.frames,
+                         dt=args.dt, draw_every=args.draw_every, time_scale=args.time_scale)
+    print(json.dumps(summarize(sessions, time.perf_counter() - start), indent=1))
@@ -0,0 +1,21 @@
+# Vectorized hit testing: which of many targets did the player click on?
+# Targets are given as arrays of rect corners in draw order (games that
+# keep positions in arrays already have them: pos - half, pos + half), and
+# topmost() gives back the index of the topmost target under a point, the
+# one drawn last. One NumPy step tests every rect, which beats looping over
+# Actors once there are more than a handful. There is nothing to build or
+# keep up to date, so it suits targets that move every frame.
+#   hit = topmost(fruit_pos - fruit_half, fruit_pos + fruit_half, pos)
+import numpy as np
+
+
+def inside(low, high, pos):
+    # Mask of the rects that contain pos, with Actor.collidepoint()'s edges
+    x, y = pos
+    return (low[:, 0] <= x) & (x < high[:, 0]) & (low[:, 1] <= y) & (y < high[:, 1])
+
+
+def topmost(low, high, pos):
+    # Index of the last rect containing pos, or None
+    found = np.flatnonzero(inside(low, high, pos))
+    return int(found[-1]) if len(found) else None
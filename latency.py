@@ -0,0 +1,116 @@
+# Input-to-display latency: how long a click or key press takes to show up.
+# install() wraps a game's input handlers (on_mouse_down, on_key_down) so
+# each call is timestamped when pgzero dispatches it, and wraps draw() so
+# the inputs waiting on a frame are marked once it has been drawn. The first
+# pygame.display.flip() after that puts the frame on screen, and the time
+# from the input to the end of that flip is the input's latency. Inputs are
+# matched to the next frame drawn, which is where red.py and shoot.py show
+# what a click did. Auto-play clicks in dev mode go through the same
+# handlers and count too. stats() has the session's percentiles and a
+# histogram; minigame.finish() puts it in the result, and red.py and
+# shoot.py show dev_lines() in dev mode.
+import time
+
+import pygame
+
+INPUT_HANDLERS = ("on_mouse_down", "on_key_down")
+BUCKETS_MS = [8, 17, 33, 50, 100, 250]  # Histogram upper edges: half a 60 FPS frame, one, two, ...
+
+pending = []  # Input times not drawn yet
+drawn = []  # Input times drawn but not flipped yet
+latencies = []  # Seconds from input to flip, this session
+
+_WRAPPER = """
+def {name}({params}):
+    pending.append(time.perf_counter())
+    return fn({params})
+"""
+
+
+def reset():
+    pending.clear()
+    drawn.clear()
+    latencies.clear()
+
+
+def timed_input(fn):
+    # Same parameter names as fn: pgzero and MiniGameHost pass arguments by name
+    code = fn.__code__
+    params = ", ".join(code.co_varnames[:code.co_argcount])
+    scope = {"fn": fn, "pending": pending, "time": time}
+    exec(_WRAPPER.format(name=fn.__name__, params=params), scope)
+    wrapper = scope[fn.__name__]
+    wrapper.__defaults__ = fn.__defaults__
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def timed_draw(draw):
+    def draw_and_mark():
+        draw()
+        if pending:
+            drawn.extend(pending)
+            pending.clear()
+    draw_and_mark.__wrapped__ = draw
+    return draw_and_mark
+
+
+def timed_flip(flip):
+    def flip_and_measure():
+        flip()
+        if drawn:
+            now = time.perf_counter()
+            latencies.extend(now - start for start in drawn)
+            drawn.clear()
+    flip_and_measure.__wrapped__ = flip
+    return flip_and_measure
+
+
+def install(namespace):
+    # Time a game's inputs until they are on screen. Call it last, before
+    # pgzrun.go(), so the timestamp is taken before any other wrapper runs.
+    for name in INPUT_HANDLERS:
+        handler = namespace.get(name)
+        if handler is not None:
+            namespace[name] = timed_input(handler)
+    if namespace.get('draw') is not None:
+        namespace['draw'] = timed_draw(namespace['draw'])
+    if not hasattr(pygame.display.flip, "__wrapped__"):
+        pygame.display.flip = timed_flip(pygame.display.flip)  # Once per process
+
+
+def histogram():
+    # Inputs per bucket, e.g. {"<=17ms": 12, ..., ">250ms": 0}
+    counts = {f"<={edge}ms": 0 for edge in BUCKETS_MS}
+    counts[f">{BUCKETS_MS[-1]}ms"] = 0
+    labels = list(counts)
+    for latency in latencies:
+        ms = round(latency * 1000)  # Two 60 FPS frames (33.3 ms) go in <=33ms
+        index = next((i for i, edge in enumerate(BUCKETS_MS) if ms <= edge), len(BUCKETS_MS))
+        counts[labels[index]] += 1
+    return counts
+
+
+def stats():
+    if not latencies:
+        return {"count": 0, "p50_ms": 0, "p95_ms": 0, "max_ms": 0, "histogram": histogram()}
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "histogram": histogram(),
+    }
+
+
+def dev_lines():
+    # Two short lines for a dev overlay: percentiles, then the histogram
+    # with its bucket edges in ms
+    summary = stats()
+    edges = [f"<={BUCKETS_MS[0]}"] + [str(edge) for edge in BUCKETS_MS[1:]] + [f">{BUCKETS_MS[-1]}"]
+    return [
+        f"lag p50/p95/max: {summary['p50_ms']:.0f}/{summary['p95_ms']:.0f}/{summary['max_ms']:.0f} ms "
+        f"({summary['count']})",
+        " ".join(f"{edge}:{count}" for edge, count in zip(edges, summary["histogram"].values())),
+    ]
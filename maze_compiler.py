@@ -0,0 +1,119 @@
+# Compiled binary maze format.
+# maze.txt stays the authoring format; `python maze_compiler.py maze.txt`
+# turns it into a .cmz file: a fixed header (size, start and finish cells)
+# followed by one tile code per cell in maze_grid order. Compiled mazes are
+# opened with mmap, so loading is near-instant whatever the size and pages
+# are only read from disk when the game touches them. The map is
+# copy-on-write: placing and removing stars never changes the file.
+import mmap
+import os
+import struct
+import sys
+
+from maze_grid import MazeGrid
+
+MAGIC = b"CMZ1"
+# magic, header size, rows, cols, start r/c, finish r/c (-1 if missing)
+HEADER = struct.Struct("<4sIIIiiii")
+BUILD_DIR = os.path.join("build", "mazes")
+
+
+class MappedCells:
+    # Tile codes of a memory-mapped maze, indexed from 0 like a bytearray
+    def __init__(self, mapped, offset, length):
+        self.mapped = mapped
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(self.length)
+            return self.mapped[self.offset + start:self.offset + stop]
+        if i < 0:
+            i += self.length
+        return self.mapped[self.offset + i]
+
+    def __setitem__(self, i, code):
+        self.mapped[self.offset + i] = code
+
+    def __bytes__(self):
+        return self.mapped[self.offset:self.offset + self.length]
+
+    def find(self, sub, start=0, end=None):
+        end = self.length if end is None else min(end, self.length)
+        i = self.mapped.find(sub, self.offset + start, self.offset + end)
+        return i - self.offset if i >= 0 else -1
+
+    def count(self, sub, block=1 << 20):
+        # mmap has no count(); go through it a block at a time
+        total = 0
+        for start in range(0, self.length, block):
+            total += self.mapped[self.offset + start:self.offset + min(start + block, self.length)].count(sub)
+        return total
+
+
+def write_compiled(grid, path):
+    # Written next to path and then moved over it: a running game may have
+    # the old file mapped, and rewriting it in place would pull the pages
+    # out from under it (SIGBUS)
+    start = grid.start or (-1, -1)
+    finish = grid.finish or (-1, -1)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, HEADER.size, grid.rows, grid.cols, *start, *finish))
+            f.write(bytes(grid.cells))
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)  # Only left over if writing failed
+
+
+def compile_maze(text_path, out_path):
+    write_compiled(MazeGrid.load(text_path), out_path)
+
+
+def load_compiled(path):
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, header_size, rows, cols, start_r, start_c, finish_r, finish_c = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a compiled maze")
+    if len(mapped) < header_size + rows * cols:
+        raise ValueError(f"{path} is truncated")
+
+    start = (start_r, start_c) if start_r >= 0 else None
+    finish = (finish_r, finish_c) if finish_r >= 0 else None
+    return MazeGrid(rows, cols, MappedCells(mapped, header_size, rows * cols), start, finish)
+
+
+def compiled_path(text_path):
+    folder, filename = os.path.split(text_path)
+    return os.path.join(folder, BUILD_DIR, os.path.splitext(filename)[0] + ".cmz")
+
+
+def load_maze(path):
+    # Load a .cmz directly, or a text maze through its compiled copy in
+    # build/mazes/ (recompiled whenever the text is newer)
+    if path.endswith(".cmz"):
+        return load_compiled(path)
+
+    out_path = compiled_path(path)
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        compile_maze(path, out_path)
+    return load_compiled(out_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python maze_compiler.py maze.txt [out.cmz]")
+        sys.exit(1)
+    text_path = sys.argv[1]
+    out_path = sys.argv[2] if len(sys.argv) == 3 else os.path.splitext(text_path)[0] + ".cmz"
+    compile_maze(text_path, out_path)
+    print(f"Compiled {text_path} -> {out_path}")
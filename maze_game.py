@@ -1,16 +1,39 @@
+import atexit
 import os
 import sys
 import subprocess
+import time
 
 os.environ["SDL_VIDEO_WINDOW_POS"] = f"50,50"
 import pgzrun
 import random
+import atlas
+from maze_compiler import load_maze
+from maze_grid import WALL, PATH, FINISH, STAR, place_stars_retry, place_stars_sampled
+import maze_solver
+from maze_render import MazeLayer, Camera
+from minigame_host import MiniGameHost
+from minigame_pool import MiniGamePool
+import minigame
+import tracing
+import results_store
+from text_cache import Label, draw_text
+
+atlas.install()  # Images are drawn from the sprite atlas
 
 # --- CONFIGURATION ---
 WIDTH = 600
 HEIGHT = 600
 SQUARE_SIZE = 10
-RESULT_FILE = "results.txt"
+MAZE_FILE = "maze.txt"  # Text maze, or a compiled .cmz from maze_compiler.py
+MAZE_GENERATE = None  # (rows, cols) to play a generated maze instead of MAZE_FILE
+MAZE_SEED = None  # Seed for MAZE_GENERATE (None = different every game)
+STAR_PLACEMENT = "sample"  # "sample" (single pass), "retry" (reroll until enough stars) or "route" (near the solution)
+STAR_ROUTE_DISTANCE = 3  # "route" placement: max steps from the shortest start-to-finish path
+CHECK_SOLVABLE = False  # Warn at load if MAZE_FILE has no path to the finish (slow on huge mazes)
+MINIGAME_MODE = "host"  # "host" (inside the maze window), "pool" (pre-warmed processes) or "subprocess"
+MINIGAME_POOL_SIZE = 2  # Warm worker processes kept ready in "pool" mode
+MAZE_SIZE = (WIDTH, HEIGHT)
 
 # List of available mini-games
 MINI_GAMES = [
@@ -22,7 +45,7 @@ MINI_GAMES = [
 ]
 
 # --- VARIABLES ---
-global maze_map, maze, new_game, star_count, new_map
+global maze, maze_layer, camera, new_game, star_count, new_map
 Actor: Actor  # type: ignore
 keys: keys  # type: ignore
 
@@ -34,76 +57,88 @@ minimum_star = 5
 star_count = 0
 lives = 3
 
-# States: "play", "prompt", "win", "gameover"
+# States: "play", "prompt", "minigame", "win", "gameover"
 game_state = "play"
 current_game = None
 game_locations = {}
+host = MiniGameHost()
+pool = MiniGamePool(MINIGAME_POOL_SIZE) if MINIGAME_MODE == "pool" else None
+if pool:
+    atexit.register(pool.close)  # Shut idle workers down when the maze quits
+show_hint = False  # [H] highlights the next step towards the finish
+session = results_store.new_session()  # Links this maze's results to its mini-games'
+session_started = time.perf_counter()
+frame_counter = minigame.FrameCounter()  # Frame times for the session's result, without keeping every frame
+
+# --- DEVMODE VARIABLES ---
+dev_mode = False
+auto_walk = False  # [G] walks the shortest path by itself
+AUTO_WALK_INTERVAL = 0.05  # Seconds per auto-walk step
+auto_walk_timer = 0
 
 player = Actor('player')
 
+# HUD lines, re-rendered only when the numbers change
+lives_label = Label("Lives: {}", topright=(WIDTH - 80, 10), fontsize=30, color="red", shadow=(1, 1), scolor="black")
+score_label = Label("Score: {}", topright=(WIDTH - 80, 40), fontsize=30, color="white", shadow=(1, 1),
+                    scolor="black")
+
 if percent_star < 1:
     percent_star = 1
 
 
 def get_maze():
-    global maze, maze_map, game_locations
-    stars = 0
+    global maze, maze_layer, camera, game_locations
     game_locations = {}
 
-    while stars < minimum_star:
-        stars = 0
-        maze = []
-        maze_map = []
-
+    if MAZE_GENERATE:
+        from maze_generator import generate  # Needs NumPy
+        maze = generate(*MAZE_GENERATE, seed=MAZE_SEED)
+    else:
         try:
-            file = open("maze.txt", 'r')
+            # Text mazes are compiled once to build/mazes/ and memory-mapped
+            maze = load_maze(MAZE_FILE)
         except FileNotFoundError:
-            print("Error: maze.txt not found.")
+            print(f"Error: {MAZE_FILE} not found.")
+            return
+        if maze.start is None:
+            print(f"Error: {MAZE_FILE} has no start cell ('s').")
             return
 
-        r = 0
-        for row in file.readlines():
-            c = 0
-            maze.append([])
-            maze_map.append([])
-            for column in row:
-                if column in "xwsfo":
-                    maze[r].append(column)
-
-                    if column == 'w':
-                        maze_map[r].append(Actor('wall'))
-
-                    elif column == 'o':
-                        # Randomly place a Red Star (Mini-game)
-                        if new_game and random.randint(1, 100) in range(1, percent_star + 1):
-                            maze_map[r].append(Actor('red-star-path'))
-                            maze[r][c] = 'r'  # Mark as 'r' for logic
-
-                            # Assign a random game to this spot
-                            game_locations[(r, c)] = random.choice(MINI_GAMES)
-                            stars += 1
-                        else:
-                            maze_map[r].append(Actor('path'))
-
-                    elif column == 's':
-                        maze_map[r].append(Actor('start'))
-                        if new_game:
-                            # Calculate Player Start Position
-                            start_pos = (SQUARE_SIZE / 2 + c * SQUARE_SIZE, SQUARE_SIZE / 2 + r * SQUARE_SIZE)
-                            player.x, player.y = start_pos
-                            player.r = int((player.y - SQUARE_SIZE / 2) / SQUARE_SIZE)
-                            player.c = int((player.x - SQUARE_SIZE / 2) / SQUARE_SIZE)
-
-                    elif column == 'f':
-                        maze_map[r].append(Actor('finish'))
-
-                    # Set position for the actor we just added
-                    maze_map[r][c].pos = (SQUARE_SIZE / 2 + c * SQUARE_SIZE, SQUARE_SIZE / 2 + r * SQUARE_SIZE)
-                    c += 1
-                elif column == '\n':
-                    r += 1
-
-    file.close()
+    if new_game:
+        # Calculate Player Start Position
+        r, c = maze.start
+        player.x, player.y = (SQUARE_SIZE / 2 + c * SQUARE_SIZE, SQUARE_SIZE / 2 + r * SQUARE_SIZE)
+        player.r = r
+        player.c = c
+
+        place_stars()
+
+    # Checking builds the whole distance field, which takes seconds on huge
+    # mazes; generated ones are solvable by construction, and "route" stars
+    # have just built the field anyway. Hints and auto-walk build it on use.
+    if not MAZE_GENERATE and (CHECK_SOLVABLE or STAR_PLACEMENT == "route") and not maze_solver.is_solvable(maze):
+        print(f"Warning: {MAZE_FILE} has no path from start to finish.")
+
+    # The maze is rendered in chunks as the camera reaches them
+    maze_layer = MazeLayer(maze, SQUARE_SIZE)
+    camera = Camera(WIDTH, HEIGHT, maze_layer.width, maze_layer.height)
+
+
+def place_stars():
+    global game_locations
+
+    if STAR_PLACEMENT == "retry":
+        stars = place_stars_retry(maze, percent_star, minimum_star)
+    elif STAR_PLACEMENT == "route":
+        stars = maze_solver.place_stars_near_route(maze, percent_star, minimum_star, STAR_ROUTE_DISTANCE)
+    else:
+        stars = place_stars_sampled(maze, percent_star, minimum_star)
+
+    # Assign a random game to each star
+    game_locations = {}
+    for i in stars:
+        game_locations[divmod(i, maze.cols)] = random.choice(MINI_GAMES)
 
 
 def check_win():
@@ -112,57 +147,57 @@ def check_win():
     player.r = int((player.y - SQUARE_SIZE / 2) / SQUARE_SIZE)
     player.c = int((player.x - SQUARE_SIZE / 2) / SQUARE_SIZE)
 
-    if maze[player.r][player.c] == 'f' and not game_over:
+    if maze.get(player.r, player.c) == FINISH and not game_over:
         game_over = True
         game_state = "win"
         print('You win!')
+        record_session("WIN")
+        tracing.dump("maze_game")
 
 
 def draw():
-    global new_game, maze_map, maze
+    global new_game
+
+    if game_state == "minigame":
+        host.draw()
+        return
+
     screen.clear()
 
-    # Draw the map actors
-    for r in range(len(maze_map)):
-        for c in range(len(maze_map[r])):
-            maze_map[r][c].draw()
+    # Draw the part of the map around the player
+    camera.follow(player.x, player.y)
+    maze_layer.draw(screen, camera)
 
     new_game = False
-    player.draw()
+    if show_hint and game_state == "play":
+        draw_hint()
+    screen.blit(player.image, camera.to_screen(player.left, player.top))
 
     # --- UI: Lives and Score ---
-    screen.draw.text(
-        f"Lives: {lives}",
-        topright=(WIDTH - 80, 10),
-        fontsize=30,
-        color="red",
-        shadow=(1, 1),
-        scolor="black"
-    )
-
+    lives_label.draw(screen, lives)
     # Score directly under lives (y=40)
-    screen.draw.text(
-        f"Score: {star_count}",
-        topright=(WIDTH - 80, 40),
-        fontsize=30,
-        color="white",
-        shadow=(1, 1),
-        scolor="black"
-    )
+    score_label.draw(screen, star_count)
 
     # --- Overlays ---
     if game_state == "win":
-        screen.draw.text("YOU WIN!", center=(WIDTH / 2, HEIGHT / 2), fontsize=60, color="green", shadow=(1, 1),
-                         scolor="black")
+        draw_text(screen, "YOU WIN!", center=(WIDTH / 2, HEIGHT / 2), fontsize=60, color="green", shadow=(1, 1),
+                  scolor="black")
 
     elif game_state == "gameover":
-        screen.draw.text("GAME OVER", center=(WIDTH / 2, HEIGHT / 2), fontsize=60, color="red", shadow=(1, 1),
-                         scolor="black")
+        draw_text(screen, "GAME OVER", center=(WIDTH / 2, HEIGHT / 2), fontsize=60, color="red", shadow=(1, 1),
+                  scolor="black")
 
     elif game_state == "prompt":
         draw_prompt()
 
 
+def draw_hint():
+    step = maze_solver.next_step(maze, player.r, player.c)
+    if step:
+        x, y = camera.to_screen(step[1] * SQUARE_SIZE, step[0] * SQUARE_SIZE)
+        screen.draw.rect(Rect((x, y), (SQUARE_SIZE, SQUARE_SIZE)), "yellow")
+
+
 def draw_prompt():
     # Helper to draw the popup box
     box = Rect((100, 200), (400, 200))
@@ -170,85 +205,180 @@ def draw_prompt():
     screen.draw.rect(box, "white")
 
     game_name = current_game['name']
-    screen.draw.text(f"Game: {game_name}", center=(300, 240), fontsize=35, color="cyan")
-    screen.draw.text("Play for +1 Score?", center=(300, 290), fontsize=30, color="white")
-    screen.draw.text("[Y] Yes    [N] No", center=(300, 350), fontsize=40, color="yellow")
+    draw_text(screen, f"Game: {game_name}", center=(300, 240), fontsize=35, color="cyan")
+    draw_text(screen, "Play for +1 Score?", center=(300, 290), fontsize=30, color="white")
+    draw_text(screen, "[Y] Yes    [N] No", center=(300, 350), fontsize=40, color="yellow")
 
 
 def collect_star():
-    global star_count, maze_map, maze
+    global star_count, maze
     star_count += 1
     print(f"Stars collected: {star_count}")
 
-    # Remove star logically and visually
-    maze[player.r][player.c] = 'o'
-    maze_map[player.r][player.c].image = "path"
+    # Remove star
+    remove_star()
+
+
+def remove_star():
+    # Clear the star under the player and redraw just that tile
+    maze.set(player.r, player.c, PATH)
+    maze_layer.mark_dirty(player.r, player.c)
 
 
 def run_minigame():
-    global lives, game_state
+    global game_state, WIDTH, HEIGHT
+
+    if MINIGAME_MODE == "host":
+        # Play inside this window; minigame_finished() is called at the end
+        host.start(current_game, screen, minigame_finished)
+        WIDTH, HEIGHT = host.size  # pgzero resizes the window next frame
+        game_state = "minigame"
+        return
 
     script_file = current_game['file']
 
-    # Run the external python file
-    subprocess.call([sys.executable, script_file])
+    # Run the external python file; it reports its result over the stdout pipe
+    if pool:
+        output = pool.run(script_file)
+    else:
+        output = subprocess.run([sys.executable, script_file], stdout=subprocess.PIPE, text=True).stdout
+
+    minigame_finished(minigame.parse_result(output))
 
-    # Check the result file that the minigame should have written
-    result = "UNKNOWN"
-    if os.path.exists(RESULT_FILE):
-        with open(RESULT_FILE, "r") as f:
-            result = f.read().strip()
-        os.remove(RESULT_FILE)  # Clean up
 
-    if result == "WIN":
+def minigame_finished(result):
+    # result is the game's result dict, or None if it was closed early
+    global lives, game_state, WIDTH, HEIGHT
+    WIDTH, HEIGHT = MAZE_SIZE
+
+    if result and "trace" in result:
+        tracing.merge(result.pop("trace"))  # Spans from the mini-game's process
+    outcome = result["outcome"] if result else "UNKNOWN"
+    lag = (result or {}).get("latency") or {}
+    if lag.get("count"):
+        print(f"{current_game['name']}: {outcome} (input lag p50 {lag['p50_ms']} ms, p95 {lag['p95_ms']} ms)")
+    else:
+        print(f"{current_game['name']}: {outcome}")
+
+    if outcome == "WIN":
         collect_star()
     else:
         # Loss or window closed without winning
         lives -= 1
         # We remove the star anyway so they don't get stuck in a loop
-        maze[player.r][player.c] = 'o'
-        maze_map[player.r][player.c].image = "path"
+        remove_star()
+
+    results_store.record(current_game['name'], result, session, lives)
 
     if lives <= 0:
         game_state = "gameover"
+        record_session("LOSS")
+        tracing.dump("maze_game")
     else:
         game_state = "play"
 
 
-def on_key_down(key):
-    global maze, game_state, current_game
+def record_session(outcome):
+    result = {
+        "outcome": outcome,
+        "score": star_count,
+        "elapsed": round(time.perf_counter() - session_started, 3),
+        "frames": frame_counter.stats(),
+    }
+    results_store.record(results_store.MAZE_GAME, result, session, lives)
+
+
+def update(dt):
+    global auto_walk_timer
+    frame_counter.add(dt)
+
+    if game_state == "minigame":
+        host.update(dt)
+
+    # DEVMODE: Auto-walk towards the finish
+    elif dev_mode and auto_walk and game_state == "play":
+        auto_walk_timer += dt
+        if auto_walk_timer >= AUTO_WALK_INTERVAL:
+            auto_walk_timer = 0
+            step = maze_solver.next_step(maze, player.r, player.c)
+            if step:
+                move_player(step[0] - player.r, step[1] - player.c)
+
+
+def on_mouse_down(pos, button):
+    if game_state == "minigame":
+        host.call('on_mouse_down', pos=pos, button=button)
+
+
+def on_mouse_up(pos, button):
+    if game_state == "minigame":
+        host.call('on_mouse_up', pos=pos, button=button)
+
+
+def on_mouse_move(pos, rel, buttons):
+    if game_state == "minigame":
+        host.call('on_mouse_move', pos=pos, rel=rel, buttons=buttons)
+
+
+def on_key_up(key, mod):
+    if game_state == "minigame":
+        host.call('on_key_up', key=key, mod=mod)
+
+
+def on_music_end():
+    if game_state == "minigame":
+        host.call('on_music_end')
+
+
+def move_player(dr, dc):
+    global game_state, current_game
+
+    if maze.get(player.r + dr, player.c + dc) != WALL:
+        player.x += dc * SQUARE_SIZE
+        player.y += dr * SQUARE_SIZE
+
+    # Update Grid Coordinates
+    player.r = int((player.y - SQUARE_SIZE / 2) / SQUARE_SIZE)
+    player.c = int((player.x - SQUARE_SIZE / 2) / SQUARE_SIZE)
+
+    # Check for star at new location
+    if maze.get(player.r, player.c) == STAR:
+        current_game = game_locations.get((player.r, player.c))
+        game_state = "prompt"
+
+    check_win()
+
+
+def on_key_down(key, mod, unicode):
+    global maze, game_state, show_hint, auto_walk
+
+    if game_state == "minigame":
+        host.call('on_key_down', key=key, mod=mod, unicode=unicode)
 
-    if game_state == "play":
+    elif game_state == "play":
         # Check intended move direction
-        if (key == keys.UP or key == keys.W) and maze[player.r - 1][player.c] != 'w':
-            player.y -= SQUARE_SIZE
-        elif (key == keys.LEFT or key == keys.A) and maze[player.r][player.c - 1] != 'w':
-            player.x -= SQUARE_SIZE
-        elif (key == keys.DOWN or key == keys.S) and maze[player.r + 1][player.c] != 'w':
-            player.y += SQUARE_SIZE
-        elif (key == keys.RIGHT or key == keys.D) and maze[player.r][player.c + 1] != 'w':
-            player.x += SQUARE_SIZE
-
-        # Update Grid Coordinates
-        player.r = int((player.y - SQUARE_SIZE / 2) / SQUARE_SIZE)
-        player.c = int((player.x - SQUARE_SIZE / 2) / SQUARE_SIZE)
-
-        # Check for star at new location
-        if maze[player.r][player.c] == 'r':
-            current_game = game_locations.get((player.r, player.c))
-            game_state = "prompt"
-
-        check_win()
+        if key == keys.UP or key == keys.W:
+            move_player(-1, 0)
+        elif key == keys.LEFT or key == keys.A:
+            move_player(0, -1)
+        elif key == keys.DOWN or key == keys.S:
+            move_player(1, 0)
+        elif key == keys.RIGHT or key == keys.D:
+            move_player(0, 1)
+        elif key == keys.H:
+            show_hint = not show_hint
+        elif key == keys.G and dev_mode:
+            auto_walk = not auto_walk
 
     elif game_state == "prompt":
         if key == keys.Y:
             run_minigame()
         elif key == keys.N:
             # Skip game, remove star
-            maze[player.r][player.c] = 'o'
-            maze_map[player.r][player.c].image = "path"
+            remove_star()
             game_state = "play"
 
 
 get_maze()
+tracing.install(globals())  # Only with GAME_TRACE=1
 pgzrun.go()
\ No newline at end of file
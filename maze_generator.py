@@ -0,0 +1,77 @@
+# Procedural mazes in the maze.txt vocabulary ('w', 'o', 's', 'f').
+# Uses the sidewinder algorithm, done for every row at once with NumPy
+# instead of cell by cell. Rooms sit on odd rows/columns with walls
+# between them. In each row, runs of rooms are joined eastwards, and every
+# run gets one opening to the row above. The result is a perfect maze:
+# exactly one route between any two cells, start at the top left, finish at
+# the bottom right. The same seed always gives the same maze.
+#   python maze_generator.py ROWS COLS [SEED] out.txt|out.cmz
+import sys
+
+import numpy as np
+
+from maze_grid import MazeGrid, WALL, PATH, START, FINISH
+
+CLOSE_CHANCE = 0.5  # Chance a run stops at each room (lower = longer corridors)
+
+
+def generate_cells(rows, cols, seed=None):
+    # Returns a (rows, cols) uint8 array of tile codes. Sizes are rounded
+    # down to odd numbers so the maze has a wall all the way round.
+    rows -= 1 - rows % 2
+    cols -= 1 - cols % 2
+    if rows < 3 or cols < 3:
+        raise ValueError("A maze needs at least 3 x 3 cells")
+    rng = np.random.default_rng(seed)
+    room_rows, room_cols = (rows - 1) // 2, (cols - 1) // 2
+
+    cells = np.full((rows, cols), WALL, dtype=np.uint8)
+    cells[1::2, 1::2] = PATH
+
+    # Where each run of rooms ends. The top row is one long run.
+    close = rng.random((room_rows, room_cols), dtype=np.float32) < CLOSE_CHANCE
+    close[:, -1] = True
+    close[0, :-1] = False
+
+    # Join rooms that don't end a run to their east neighbour
+    cells[1::2, 2:-1:2][~close[:, :-1]] = PATH
+
+    # Every run below the top row opens north from one of its rooms. Runs
+    # never cross rows (each row ends with a closed room), so they can be
+    # found on the flattened array.
+    ends = np.flatnonzero(close[1:])
+    starts = np.zeros_like(ends)
+    starts[1:] = ends[:-1] + 1
+    picks = starts + (rng.random(len(ends)) * (ends - starts + 1)).astype(np.int64)
+    pick_r, pick_c = np.divmod(picks, room_cols)
+    cells[pick_r * 2 + 2, pick_c * 2 + 1] = PATH
+
+    cells[1, 1] = START
+    cells[rows - 2, cols - 2] = FINISH
+    return cells
+
+
+def generate(rows, cols, seed=None):
+    cells = generate_cells(rows, cols, seed)
+    rows, cols = cells.shape
+    return MazeGrid(rows, cols, bytearray(cells.tobytes()), (1, 1), (rows - 2, cols - 2))
+
+
+def write(path, rows, cols, seed=None):
+    # Text for .txt paths, the compiled format for .cmz
+    grid = generate(rows, cols, seed)
+    if path.endswith(".cmz"):
+        from maze_compiler import write_compiled
+        write_compiled(grid, path)
+    else:
+        grid.save(path)
+    return grid
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python maze_generator.py ROWS COLS [SEED] out.txt|out.cmz")
+        sys.exit(1)
+    seed = int(sys.argv[3]) if len(sys.argv) == 5 else None
+    grid = write(sys.argv[-1], int(sys.argv[1]), int(sys.argv[2]), seed)
+    print(f"Generated a {grid.rows} x {grid.cols} maze -> {sys.argv[-1]}")
@@ -0,0 +1,214 @@
+# Compact maze grid used by maze_game.py.
+# One byte per cell, stored row after row (index = r * cols + c), so a
+# 10k x 10k maze takes ~100 MB instead of a list of lists of strings.
+# `cells` is normally a bytearray, but anything with indexing, slicing,
+# find() and count() works (maze_compiler maps compiled mazes from disk).
+import math
+import random
+
+# --- TILE CODES ---
+EMPTY = 0   # 'x'
+WALL = 1    # 'w'
+PATH = 2    # 'o'
+START = 3   # 's'
+FINISH = 4  # 'f'
+STAR = 5    # 'r' (path with a mini-game star on it)
+
+TILE_CHARS = "xwosfr"  # Character for each code, by index
+TILE_IMAGES = [None, 'wall', 'path', 'start', 'finish', 'red-star-path']
+
+# Text -> code translation. Anything that isn't a tile character is dropped.
+_TEXT_TABLE = bytes.maketrans(b"xwosf", bytes([EMPTY, WALL, PATH, START, FINISH]))
+_NOT_TILES = bytes(b for b in range(256) if b not in b"xwosf")
+_CODE_TABLE = bytes.maketrans(bytes(range(len(TILE_CHARS))), TILE_CHARS.encode())
+
+
+class MazeGrid:
+    def __init__(self, rows, cols, cells=None, start=None, finish=None):
+        self.rows = rows
+        self.cols = cols
+        if cells is None:
+            cells = bytearray([WALL]) * (rows * cols)
+        self.cells = cells
+        # (r, c) of the 's' and 'f' cells, looked up if not given
+        self.start = start or self.find(START)
+        self.finish = finish or self.find(FINISH)
+
+    @classmethod
+    def from_text(cls, data):
+        # Parse maze text (str or bytes)
+        if isinstance(data, str):
+            data = data.encode()
+        return cls.from_lines(data.split(b"\n"))
+
+    @classmethod
+    def from_lines(cls, lines):
+        # Rows are appended straight into one bytearray so big mazes
+        # never exist as a list of rows. Short rows are padded with walls.
+        cells = bytearray()
+        widths = []
+        for line in lines:
+            row = line.translate(_TEXT_TABLE, _NOT_TILES)
+            cells += row
+            widths.append(len(row))
+
+        while widths and widths[-1] == 0:
+            widths.pop()
+
+        cols = max(widths, default=0)
+        if any(width != cols for width in widths):
+            ragged = cells
+            cells = bytearray([WALL]) * (len(widths) * cols)
+            start = 0
+            for r, width in enumerate(widths):
+                cells[r * cols:r * cols + width] = ragged[start:start + width]
+                start += width
+        return cls(len(widths), cols, cells)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_lines(f)
+
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def get(self, r, c):
+        # Anything outside the maze counts as a wall
+        if not self.in_bounds(r, c):
+            return WALL
+        return self.cells[r * self.cols + c]
+
+    def set(self, r, c, code):
+        self.cells[r * self.cols + c] = code
+
+    def find(self, code):
+        # (r, c) of the first cell with this code, or None
+        i = self.cells.find(bytes([code]))
+        if i < 0:
+            return None
+        return divmod(i, self.cols)
+
+    def positions(self, code):
+        # Yield the flat index of every cell with this code
+        cells = self.cells
+        needle = bytes([code])
+        i = cells.find(needle)
+        while i >= 0:
+            yield i
+            i = cells.find(needle, i + 1)
+
+    def count(self, code):
+        return self.cells.count(bytes([code]))
+
+    def row(self, r):
+        start = r * self.cols
+        return self.cells[start:start + self.cols]
+
+    def save(self, path):
+        # Write the maze back out in the maze.txt text format
+        text = bytes(self.cells).translate(_CODE_TABLE)
+        cols = self.cols
+        with open(path, 'wb') as f:
+            for start in range(0, len(text), cols):
+                f.write(text[start:start + cols])
+                f.write(b"\n")
+
+    def nth_positions(self, code, ranks):
+        # Flat indices of the cells that are the ranks[i]-th cell with this
+        # code, in reading order. ranks must be sorted. Rows without a
+        # wanted cell are skipped with a single count().
+        cells = self.cells
+        needle = bytes([code])
+        result = []
+        ranks = iter(ranks)
+        rank = next(ranks, None)
+        seen = 0
+
+        for r in range(self.rows):
+            if rank is None:
+                break
+            start = r * self.cols
+            end = start + self.cols
+            in_row = cells[start:end].count(needle)
+            if rank < seen + in_row:
+                i = cells.find(needle, start, end)
+                j = seen
+                while rank is not None and rank < seen + in_row:
+                    while j < rank:
+                        i = cells.find(needle, i + 1, end)
+                        j += 1
+                    result.append(i)
+                    rank = next(ranks, None)
+            seen += in_row
+        return result
+
+
+# --- STAR PLACEMENT ---
+# Every open cell becomes a star with a percent_star chance, and the maze
+# must end up with at least minimum_star stars.
+
+def place_stars_retry(grid, percent, minimum, rng=random):
+    # Original approach: roll every cell, start again if too few stars
+    stars = []
+    while len(stars) < minimum:
+        for i in stars:
+            grid.cells[i] = PATH
+        stars = []
+
+        for i in grid.positions(PATH):
+            if rng.randint(1, 100) in range(1, percent + 1):
+                grid.cells[i] = STAR
+                stars.append(i)
+    return stars
+
+
+def place_stars_sampled(grid, percent, minimum, rng=random):
+    # Single pass: draw how many stars the retry loop would have ended up
+    # with, then pick that many open cells uniformly. Gives the same result
+    # distribution as place_stars_retry without ever rerolling.
+    open_cells = grid.count(PATH)
+    count = star_count(open_cells, percent, minimum, rng)
+    ranks = sorted(rng.sample(range(open_cells), count))
+    stars = grid.nth_positions(PATH, ranks)
+    for i in stars:
+        grid.cells[i] = STAR
+    return stars
+
+
+def star_count(n, percent, minimum, rng=random):
+    # Binomial(n, percent%) conditioned on being at least minimum, drawn by
+    # walking the distribution out from its peak. Weights are relative to
+    # the peak so huge mazes don't underflow.
+    p = min(percent, 100) / 100
+    if p >= 1 or n <= minimum:
+        # The retry loop could never finish here; use every open cell
+        return n
+
+    odds = p / (1 - p)
+    peak = max(minimum, min(n, math.floor((n + 1) * p)))
+
+    below = []
+    k, weight = peak, 1.0
+    while k > minimum and weight > 1e-18:
+        weight *= k / ((n - k + 1) * odds)
+        k -= 1
+        below.append((k, weight))
+
+    above = []
+    k, weight = peak, 1.0
+    while k < n and weight > 1e-18:
+        weight *= (n - k) / (k + 1) * odds
+        k += 1
+        above.append((k, weight))
+
+    entries = below[::-1] + [(peak, 1.0)] + above
+    target = rng.random() * sum(weight for _, weight in entries)
+    for k, weight in entries:
+        target -= weight
+        if target < 0:
+            return k
+    return entries[-1][0]
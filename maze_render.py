@@ -0,0 +1,104 @@
+# Maze drawing for maze_game.py.
+# The maze is split into square chunks of CHUNK_SIZE tiles. A chunk is
+# rendered to its own off-screen surface the first time the camera sees it
+# and drawn with a single blit per frame after that. Chunks that drift far
+# from the camera drop their surface, so memory and draw cost depend on the
+# window size, not the maze size. Tiles that change (stars being collected
+# or skipped) are marked dirty and redrawn on the next frame.
+import pygame
+from pgzero.loaders import images
+
+from maze_grid import TILE_IMAGES
+
+BACKGROUND = (0, 0, 0)
+CHUNK_SIZE = 32     # Tiles per chunk side
+KEEP_DISTANCE = 1   # Chunks kept around the visible area before release
+
+
+class Camera:
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.width = view_width
+        self.height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        # Centre on (x, y) but never show past the edge of the maze
+        self.x = int(max(0, min(x - self.width / 2, self.world_width - self.width)))
+        self.y = int(max(0, min(y - self.height / 2, self.world_height - self.height)))
+
+    def to_screen(self, x, y):
+        return x - self.x, y - self.y
+
+
+class MazeLayer:
+    def __init__(self, grid, square_size):
+        self.grid = grid
+        self.square_size = square_size
+        self.chunk_pixels = CHUNK_SIZE * square_size
+        self.chunk_rows = -(-grid.rows // CHUNK_SIZE)
+        self.chunk_cols = -(-grid.cols // CHUNK_SIZE)
+        self.chunks = {}  # (chunk row, chunk col) -> Surface
+        self.dirty = set()
+
+    @property
+    def width(self):
+        return self.grid.cols * self.square_size
+
+    @property
+    def height(self):
+        return self.grid.rows * self.square_size
+
+    def render_chunk(self, cr, cc):
+        surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+        surface.fill(BACKGROUND)
+        r0, c0 = cr * CHUNK_SIZE, cc * CHUNK_SIZE
+        for r in range(r0, min(r0 + CHUNK_SIZE, self.grid.rows)):
+            for c in range(c0, min(c0 + CHUNK_SIZE, self.grid.cols)):
+                self.render_tile(surface, r, c)
+        self.chunks[cr, cc] = surface
+        return surface
+
+    def render_tile(self, surface, r, c):
+        size = self.square_size
+        pos = ((c % CHUNK_SIZE) * size, (r % CHUNK_SIZE) * size)
+        surface.fill(BACKGROUND, (pos, (size, size)))
+        image = TILE_IMAGES[self.grid.get(r, c)]
+        if image:
+            surface.blit(images.load(image), pos)
+
+    def mark_dirty(self, r, c):
+        self.dirty.add((r, c))
+
+    def visible_chunks(self, camera):
+        size = self.chunk_pixels
+        first_row = max(0, camera.y // size)
+        last_row = min(self.chunk_rows - 1, (camera.y + camera.height - 1) // size)
+        first_col = max(0, camera.x // size)
+        last_col = min(self.chunk_cols - 1, (camera.x + camera.width - 1) // size)
+        return first_row, last_row, first_col, last_col
+
+    def draw(self, screen, camera):
+        # Bring changed tiles up to date. Tiles in chunks that aren't
+        # resident are picked up when their chunk is next rendered.
+        for r, c in self.dirty:
+            surface = self.chunks.get((r // CHUNK_SIZE, c // CHUNK_SIZE))
+            if surface:
+                self.render_tile(surface, r, c)
+        self.dirty.clear()
+
+        first_row, last_row, first_col, last_col = self.visible_chunks(camera)
+        for cr in range(first_row, last_row + 1):
+            for cc in range(first_col, last_col + 1):
+                surface = self.chunks.get((cr, cc)) or self.render_chunk(cr, cc)
+                screen.blit(surface, camera.to_screen(cc * self.chunk_pixels, cr * self.chunk_pixels))
+
+        self.release_far_chunks(first_row, last_row, first_col, last_col)
+
+    def release_far_chunks(self, first_row, last_row, first_col, last_col):
+        for cr, cc in list(self.chunks):
+            if (cr < first_row - KEEP_DISTANCE or cr > last_row + KEEP_DISTANCE or
+                    cc < first_col - KEEP_DISTANCE or cc > last_col + KEEP_DISTANCE):
+                del self.chunks[cr, cc]
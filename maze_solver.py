@@ -0,0 +1,132 @@
+# Path finding for maze_game.py.
+# distance_field() runs one breadth-first search out from the finish cell
+# and stores, for every cell, how many steps it is from the finish (-1 for
+# cells that can't reach it, -2 for walls). Walls never change during a
+# game, so the field is computed once per maze and cached. Everything else
+# (hints, auto-walk, solvability, star placement near the route) is a cheap
+# lookup in that field.
+import random
+import weakref
+from array import array
+
+from maze_grid import WALL, PATH, STAR, star_count
+
+UNREACHABLE = -1
+BLOCKED = -2
+
+# Wall -> 0xFE (-2 as a signed byte), anything else -> 0xFF (-1)
+_START_TABLE = bytes(0xFE if code == WALL else 0xFF for code in range(256))
+
+_fields = weakref.WeakKeyDictionary()  # MazeGrid -> distance field
+
+
+def distance_field(grid):
+    field = _fields.get(grid)
+    if field is None:
+        field = _fields[grid] = build_field(grid)
+    return field
+
+
+def build_field(grid):
+    cols = grid.cols
+    size = grid.rows * cols
+    dist = array('i', array('b', bytes(grid.cells).translate(_START_TABLE)))
+    if grid.finish is None:
+        return dist
+
+    r, c = grid.finish
+    first = r * cols + c
+    dist[first] = 0
+    frontier = [first]
+    steps = 0
+
+    # One ring of cells per step; each cell is visited exactly once
+    while frontier:
+        steps += 1
+        ring = []
+        for i in frontier:
+            j = i - cols
+            if j >= 0 and dist[j] == UNREACHABLE:
+                dist[j] = steps
+                ring.append(j)
+            j = i + cols
+            if j < size and dist[j] == UNREACHABLE:
+                dist[j] = steps
+                ring.append(j)
+            if i % cols:
+                j = i - 1
+                if dist[j] == UNREACHABLE:
+                    dist[j] = steps
+                    ring.append(j)
+            if (i + 1) % cols:
+                j = i + 1
+                if dist[j] == UNREACHABLE:
+                    dist[j] = steps
+                    ring.append(j)
+        frontier = ring
+    return dist
+
+
+def distance(grid, r, c):
+    if not grid.in_bounds(r, c):
+        return BLOCKED
+    return distance_field(grid)[r * grid.cols + c]
+
+
+def is_solvable(grid):
+    return grid.start is not None and distance(grid, *grid.start) >= 0
+
+
+def next_step(grid, r, c):
+    # The neighbouring cell one step closer to the finish, or None if
+    # (r, c) is the finish or can't reach it
+    here = distance(grid, r, c)
+    if here <= 0:
+        return None
+    for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+        if distance(grid, nr, nc) == here - 1:
+            return nr, nc
+    return None
+
+
+def route(grid, r, c):
+    # Every cell from (r, c) to the finish, inclusive
+    cells = [(r, c)] if distance(grid, r, c) >= 0 else []
+    step = next_step(grid, r, c)
+    while step:
+        cells.append(step)
+        step = next_step(grid, *step)
+    return cells
+
+
+def near_route_cells(grid, max_distance):
+    # Flat indices of open cells within max_distance steps of the shortest
+    # start-to-finish route (a small BFS out from the route itself)
+    if not is_solvable(grid):
+        return []
+    cols = grid.cols
+    cells = grid.cells
+    field = distance_field(grid)
+
+    seen = {r * cols + c for r, c in route(grid, *grid.start)}
+    frontier = list(seen)
+    for _ in range(max_distance):
+        ring = []
+        for i in frontier:
+            for j in (i - cols, i + cols, i - 1 if i % cols else -1, i + 1 if (i + 1) % cols else -1):
+                if j >= 0 and j < len(field) and j not in seen and field[j] != BLOCKED:
+                    seen.add(j)
+                    ring.append(j)
+        frontier = ring
+    return sorted(i for i in seen if cells[i] == PATH)
+
+
+def place_stars_near_route(grid, percent, minimum, max_distance, rng=random):
+    # Like place_stars_sampled, but only on open cells near the route, so
+    # every star can be reached without a long detour
+    candidates = near_route_cells(grid, max_distance)
+    count = star_count(len(candidates), percent, minimum, rng)
+    stars = sorted(rng.sample(candidates, count))
+    for i in stars:
+        grid.cells[i] = STAR
+    return stars
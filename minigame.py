@@ -0,0 +1,125 @@
+# Shared start/end handling for the mini-games.
+# When a mini-game ends it reports a structured result: outcome, score,
+# elapsed time and frame statistics. Run as a process (on its own, by
+# maze_game.py or by a pool worker), the result is printed as one line on
+# stdout, prefixed with RESULT_PREFIX, which the maze reads from the pipe.
+# The game then quits after a short delay so the end screen stays up. When
+# maze_game.py runs the game in-process, `host` is set and the result goes
+# straight back to the maze instead. With GAME_TRACE=1 the result also
+# carries the game's trace spans (see tracing.py). The result's "latency"
+# has the session's input-to-display times (see latency.py).
+import collections
+import json
+import sys
+import time
+from pgzero.clock import clock
+
+import gameclock
+import latency
+import tracing
+
+RESULT_PREFIX = "MINIGAME-RESULT "
+FRAME_BUCKET = 0.0001  # Seconds; FrameCounter's p95 resolution
+FRAME_BUCKET_MAX = 1.0  # Seconds; longer frames share the last bucket, so there are at most 10000
+
+host = None  # MiniGameHost currently running a game, if any
+started = 0
+frame_times = []
+
+
+def begin(namespace=None):
+    # Start timing (and tracing) a game and put it on the game clock;
+    # called just before pgzrun.go() with the game's globals()
+    global started, frame_times
+    latency.reset()
+    if namespace is not None:
+        tracing.install(namespace)
+        gameclock.install(namespace)
+        latency.install(namespace)  # Last, so inputs are timed as pgzero hands them over
+    started = time.perf_counter()
+    frame_times = []
+    clock.unschedule(count_frame)
+    clock.each_tick(count_frame)
+
+
+def count_frame(dt):
+    frame_times.append(dt)
+
+
+def frame_stats(times):
+    if not times:
+        return {"count": 0, "mean_ms": 0, "p95_ms": 0, "max_ms": 0}
+    ordered = sorted(times)
+    return {
+        "count": len(times),
+        "mean_ms": round(sum(times) / len(times) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class FrameCounter:
+    # frame_stats() for sessions too long to keep every frame: a running
+    # count, sum and max, and a histogram of FRAME_BUCKET wide buckets for
+    # the p95 (to within one bucket)
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = collections.Counter()  # Bucket number -> frames
+
+    def add(self, dt):
+        self.count += 1
+        self.total += dt
+        self.max = max(self.max, dt)
+        self.buckets[int(min(dt, FRAME_BUCKET_MAX) / FRAME_BUCKET)] += 1
+
+    def stats(self):
+        if not self.count:
+            return frame_stats([])
+        rank = int(self.count * 0.95)  # Same nearest rank as frame_stats()
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                break
+        p95 = min((bucket + 1) * FRAME_BUCKET, self.max)  # The bucket's upper edge
+        if bucket == int(FRAME_BUCKET_MAX / FRAME_BUCKET):
+            p95 = self.max  # The last bucket has no upper edge
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+def finish(outcome, delay, score=None):
+    clock.unschedule(count_frame)
+    result = {
+        "outcome": outcome,
+        "score": score,
+        "elapsed": round(time.perf_counter() - started, 3),
+        "frames": frame_stats(frame_times),
+        "latency": latency.stats(),
+    }
+
+    if host:
+        host.finish(result, delay)  # Traced spans are already in this process
+        return
+
+    if tracing.enabled:
+        result["trace"] = tracing.events()
+        tracing.dump()
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+    clock.schedule_unique(sys.exit, delay)
+
+
+def parse_result(output):
+    # The last result line in a game's stdout, or None if it never finished
+    result = None
+    for line in (output or "").splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+    return result
+
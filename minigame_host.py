@@ -0,0 +1,112 @@
+# Runs the mini-games inside the maze process.
+# Each game script is executed as a fresh module every time it is played,
+# so it starts from clean state, but it shares the maze's window, image
+# cache, mixer and clock. maze_game.py forwards draw/update/input to the
+# running game until it calls minigame.finish(), and resizes the window to
+# the game's WIDTH/HEIGHT while it runs.
+import os
+import sys
+import types
+
+import pgzero.builtins
+from pgzero import loaders, music
+from pgzero.animation import Animation
+from pgzero.clock import clock
+
+import gameclock
+import minigame
+
+# pgzero builtins a game expects to find as globals (Actor, clock, keys...)
+GAME_BUILTINS = {k: v for k, v in vars(pgzero.builtins).items() if not k.startswith('__')}
+
+
+class MiniGameHost:
+    def __init__(self, game_dir=None):
+        # Games are looked up next to the running script by default
+        self.game_dir = game_dir or loaders.root
+        self.code_cache = {}  # Script path -> compiled code
+        self.module = None
+        self.entry = None
+        self.result = None
+        self.on_finished = None
+
+    @property
+    def running(self):
+        return self.module is not None
+
+    @property
+    def size(self):
+        return getattr(self.module, 'WIDTH', 800), getattr(self.module, 'HEIGHT', 600)
+
+    def compile(self, path):
+        code = self.code_cache.get(path)
+        if code is None:
+            with open(path) as f:
+                code = compile(f.read(), path, 'exec')
+            self.code_cache[path] = code
+        return code
+
+    def start(self, entry, screen, on_finished):
+        # Load a fresh copy of the game. on_finished(result) is called with
+        # the game's result dict once its end screen has been shown.
+        path = os.path.join(self.game_dir, entry['file'])
+        name = os.path.splitext(entry['file'])[0]
+
+        module = types.ModuleType(name)
+        module.__file__ = path
+        module.__dict__.update(GAME_BUILTINS)
+        module.screen = screen
+
+        self.entry = entry
+        self.result = None
+        self.on_finished = on_finished
+        minigame.host = self
+
+        # pgzrun.go() at the bottom of the script must not start a second loop
+        was_pgzrun = getattr(sys, '_pgzrun', None)
+        sys._pgzrun = True
+        try:
+            exec(self.compile(path), module.__dict__)
+        finally:
+            sys._pgzrun = was_pgzrun
+        self.module = module
+
+    def finish(self, result, delay):
+        # Called through minigame.finish(); keep the end screen up for `delay`
+        self.result = result
+        clock.schedule_unique(self.stop, delay)
+
+    def stop(self):
+        module = self.module
+        if module is None:
+            return
+
+        # Drop anything the game left scheduled on the shared clock
+        for value in vars(module).values():
+            if isinstance(value, types.FunctionType):
+                func = getattr(value, '__wrapped__', value)  # Traced functions are wrapped
+                if func.__globals__ is module.__dict__:
+                    clock.unschedule(value)
+        for anim in list(Animation.animations):
+            anim.stop()
+        gameclock.clock.reset()  # The maze doesn't use it, everything on it is the game's
+        music.stop()
+
+        self.module = None
+        minigame.host = None
+        self.on_finished(self.result)
+
+    def call(self, name, **event):
+        # Call one of the game's hooks with just the arguments it asks for
+        handler = getattr(self.module, name, None)
+        if not callable(handler):
+            return
+        code = handler.__code__
+        params = code.co_varnames[:code.co_argcount]
+        handler(**{param: event[param] for param in params if param in event})
+
+    def draw(self):
+        self.call('draw')
+
+    def update(self, dt):
+        self.call('update', dt=dt)
@@ -0,0 +1,61 @@
+# Pool of pre-warmed mini-game processes for maze_game.py.
+# Each worker (minigame_worker.py) has already imported pygame/pgzero and
+# decoded the game assets, so starting a game only costs opening a window.
+# A worker runs a single game and then exits; a replacement is started as
+# soon as a worker is handed a game, so it warms up while the game plays.
+import os
+import subprocess
+import sys
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minigame_worker.py")
+
+
+class MiniGamePool:
+    def __init__(self, size=2):
+        self.size = max(1, size)
+        self.workers = []
+        self.fill()
+
+    def start_worker(self):
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        return subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True
+        )
+
+    def fill(self):
+        while len(self.workers) < self.size:
+            self.workers.append(self.start_worker())
+
+    def take_worker(self):
+        # Oldest worker first, it is the most likely to be warm already
+        while self.workers:
+            worker = self.workers.pop(0)
+            line = worker.stdout.readline()
+            while line and line.strip() != "READY":
+                line = worker.stdout.readline()  # Banners or warnings printed while warming up
+            if line:
+                return worker
+            worker.wait()  # stdout closed: died while warming up
+        return None
+
+    def run(self, script_file):
+        # Play one game, wait for it to finish and return what it printed
+        # (including its minigame result line)
+        worker = self.take_worker()
+        self.fill()
+        if worker is None:
+            # No worker came up, fall back to a cold start
+            return subprocess.run([sys.executable, script_file], stdout=subprocess.PIPE, text=True).stdout
+
+        worker.stdin.write(script_file + "\n")
+        worker.stdin.flush()
+        output = worker.stdout.read()
+        worker.wait()
+        return output
+
+    def close(self):
+        for worker in self.workers:
+            worker.stdin.close()  # Idle workers exit when stdin closes
+            worker.wait()
+        self.workers = []
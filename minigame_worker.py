@@ -0,0 +1,80 @@
+# A pre-warmed process that runs one mini-game, started by minigame_pool.
+# It imports pygame and pgzero, decodes the sprite atlas and reads music/
+# into the OS file cache up front, prints READY, then waits for a game
+# script name on stdin. sounds/ is decoded too, but only the files
+# pgzero's sounds loader accepts (wav/ogg/oga). Everything in sounds/ is
+# .mp3 for now, which games can't load through it either, so nothing from
+# there is preloaded. The game runs exactly like `python <script>` but
+# skips the cold start. The process exits when the game does; the pool
+# starts a fresh one for the next game.
+import os
+import sys
+from types import ModuleType
+
+os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
+import pygame
+from pgzero import loaders
+from pgzero.runner import prepare_mod, run_mod
+
+import atlas
+import minigame  # noqa: F401 - imported ahead of the game
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_assets(subdir, extensions, load):
+    assets = {}
+    path = os.path.join(GAME_DIR, subdir)
+    for filename in os.listdir(path):
+        name, ext = os.path.splitext(filename)
+        if ext[1:].lower() in extensions:
+            assets[name] = load(os.path.join(path, filename))
+    return assets
+
+
+def read_file(path):
+    # Music is streamed by pygame, so just pull it into the OS file cache
+    with open(path, 'rb') as f:
+        f.read()
+
+
+def preload():
+    sprites = atlas.load_pages(GAME_DIR)
+    sounds = load_assets('sounds', loaders.SoundLoader.EXTNS, pygame.mixer.Sound)  # What sounds.<name> can find
+    load_assets('music', ['mp3', 'ogg', 'oga'], read_file)
+    return sprites, sounds
+
+
+def run_game(script, sprites, sounds):
+    path = os.path.join(GAME_DIR, script)
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+
+    name = os.path.splitext(script)[0]
+    mod = ModuleType(name)
+    mod.__file__ = path
+    sys.modules[name] = mod
+    sys._pgzrun = True
+    prepare_mod(mod)  # Opens the window
+
+    # Hand the decoded assets to pgzero's loaders so the game never hits disk
+    atlas.install(GAME_DIR, sprites)
+    for name, sound in sounds.items():
+        loaders.sounds.cache[loaders.sounds.cache_key(name, (), {})] = sound
+
+    exec(code, mod.__dict__)
+    run_mod(mod)
+
+
+def main():
+    sprites, sounds = preload()
+    print("READY", flush=True)
+
+    script = sys.stdin.readline().strip()
+    if not script:
+        return  # The pool shut down before we were used
+    run_game(script, sprites, sounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 import os
-import sys
 import random
 os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
 import pgzrun
 from pgzero.actor import Actor
-from pgzero.clock import clock
+import numpy as np
+from gameclock import clock
 from pygame import Rect, mouse
+import atlas
+import latency
+import minigame
+from hit_test import topmost
+from text_cache import draw_text
+from tweens import TweenPool
+
+atlas.install()  # Images are drawn from the sprite atlas
 
 # --- WINDOW CONFIGURATION ---
 WIDTH, HEIGHT = 800, 600
@@ -15,15 +23,16 @@ CENTER = (WIDTH / 2, HEIGHT / 2)
 FINAL_LEVEL = 6
 START_SPEED = 10
 COLORS = ["green", "blue"]
-RESULT_FILE = "results.txt"
 FONT_MAIN = "white"
 
 # --- GLOBAL VARIABLES ---
 game_over = False
 game_complete = False
 current_level = 1
-stars = []
-animations = []
+stars = []  # Actors, only moved to star_pos in draw()
+star_pos = np.empty((0, 2))  # Star centres; the tweens move these
+star_half = np.empty((0, 2))  # Half width and height
+tweens = TweenPool()  # Every star's movement; finished tweens free their slot
 
 # --- DEVMODE VARIABLES ---
 dev_mode = False
@@ -37,11 +46,10 @@ current_fps = 0
 
 def init_level():
     # Calculates colors and creates stars for the current level.
-    global stars, animations
+    global stars, star_pos, star_half
 
     stop_animations()
     stars.clear()
-    animations.clear()
 
     # Determine colors: Always 1 red, plus random green/blue
     colors_to_create = ["red"] + [random.choice(COLORS) for _ in range(current_level)]
@@ -53,17 +61,19 @@ def init_level():
     gap_size = WIDTH / (len(stars) + 1)
     random.shuffle(stars)
 
-    for i, star in enumerate(stars):
-        # Start at edges
-        star.x = (i + 1) * gap_size
-        star.y = 0 if i % 2 == 0 else HEIGHT
+    # Start at edges
+    star_pos = np.array([((i + 1) * gap_size, 0 if i % 2 == 0 else HEIGHT) for i in range(len(stars))],
+                        dtype=float).reshape(-1, 2)
+    star_half = np.array([(star.width / 2, star.height / 2) for star in stars], dtype=float).reshape(-1, 2)
 
-        start_animation(star)
+    for i in range(len(stars)):
+        start_animation(i)
 
 
-def start_animation(star):
-    # Starts animation for a specific star based on its current position.
-    target_y = HEIGHT if star.y < HEIGHT / 2 else 0
+def start_animation(i):
+    # Starts animation for star i based on its current position.
+    y = star_pos[i, 1]
+    target_y = HEIGHT if y < HEIGHT / 2 else 0
 
     # Calculate Base Duration
     base_duration = (START_SPEED - current_level) / speed_modifier
@@ -71,7 +81,7 @@ def start_animation(star):
 
     # Adjust duration based on distance remaining
     distance_total = HEIGHT
-    distance_remaining = abs(target_y - star.y)
+    distance_remaining = abs(target_y - y)
 
     # If unfreezing near the target, prevent instant snap
     if distance_remaining < 10:
@@ -80,8 +90,7 @@ def start_animation(star):
     time_fraction = distance_remaining / distance_total
     final_duration = base_duration * time_fraction
 
-    anim = animate(star, duration=final_duration, on_finished=handle_loss, y=target_y)
-    animations.append(anim)
+    tweens.animate_item(star_pos, (i, 1), target_y, duration=final_duration, on_finished=handle_loss)
 
 
 def toggle_freeze():
@@ -90,28 +99,22 @@ def toggle_freeze():
     freeze_mode = not freeze_mode
 
     if freeze_mode:
-        # Stop everything exactly where it is
-        stop_animations()
+        # Hold everything exactly where it is
+        tweens.pause()
     else:
-        # Resume animations from current positions
-        for star in stars:
-            start_animation(star)
+        tweens.resume()
 
 
 def stop_animations():
-    for anim in animations:
-        if anim.running:
-            anim.stop()
-    animations.clear()
+    tweens.clear()
 
 
 def schedule_shuffle():
     if stars and not game_over and not game_complete and not freeze_mode:
-        x_values = [s.x for s in stars]
+        x_values = star_pos[:, 0].tolist()
         random.shuffle(x_values)
-        for i, star in enumerate(stars):
-            anim = animate(star, duration=0.5 / speed_modifier, x=x_values[i])
-            animations.append(anim)
+        for i in range(len(stars)):
+            tweens.animate_item(star_pos, (i, 0), x_values[i], duration=0.5 / speed_modifier)
 
 
 def update(dt):
@@ -124,9 +127,9 @@ def update(dt):
     if dev_mode and auto_play and not (game_over or game_complete):
         dev_action_timer += 1
         if dev_action_timer > 30:
-            red_star = next((s for s in stars if "red" in s.image), None)
-            if red_star:
-                on_mouse_down(red_star.pos)
+            red = red_star()
+            if red is not None:
+                on_mouse_down(tuple(star_pos[red]))
             dev_action_timer = 0
 
 
@@ -135,7 +138,8 @@ def draw():
     screen.blit("space", (0, 0))
 
     if not (game_over or game_complete):
-        for star in stars:
+        for star, pos in zip(stars, star_pos.tolist()):
+            star.pos = pos
             star.draw()
             if dev_mode and show_hitboxes:
                 bbox = Rect(star.left, star.top, star.width, star.height)
@@ -155,18 +159,24 @@ def draw():
         draw_dev_dashboard()
 
 
+def red_star():
+    # Index of the red star, or None
+    return next((i for i, star in enumerate(stars) if "red" in star.image), None)
+
+
 def draw_center_text(main, sub):
-    screen.draw.text(main, fontsize=60, center=CENTER, color=FONT_MAIN)
-    screen.draw.text(sub, fontsize=30, center=(WIDTH / 2, HEIGHT / 2 + 40), color=FONT_MAIN)
+    draw_text(screen, main, fontsize=60, center=CENTER, color=FONT_MAIN)
+    draw_text(screen, sub, fontsize=30, center=(WIDTH / 2, HEIGHT / 2 + 40), color=FONT_MAIN)
 
 
 def draw_dev_dashboard():
     mx, my = mouse.get_pos()
 
-    red_star = next((s for s in stars if "red" in s.image), None)
+    red = red_star()
     dist_to_red = "N/A"
-    if red_star:
-        dist_to_red = int(((mx - red_star.x) ** 2 + (my - red_star.y) ** 2) ** 0.5)
+    if red is not None:
+        red_x, red_y = star_pos[red]
+        dist_to_red = int(((mx - red_x) ** 2 + (my - red_y) ** 2) ** 0.5)
 
     info_lines = [
         f"DEVMODE ACTIVE | FPS: {int(current_fps)}",
@@ -177,34 +187,34 @@ def draw_dev_dashboard():
         "---",
         f"Mouse: ({mx}, {my})",
         f"Dist to Target: {dist_to_red}",
+        *latency.dev_lines(),
         "Controls: (N)ext Lvl | (W)in | (L)oss"
     ]
 
     for i, line in enumerate(info_lines):
-        screen.draw.text(line, (10, 10 + (i * 15)), fontsize=18, color="yellow", owidth=1, ocolor="black")
+        draw_text(screen, line, pos=(10, 10 + (i * 15)), fontsize=18, color="yellow", owidth=1, ocolor="black")
 
 
 def on_mouse_down(pos):
-    global current_level, game_over, game_complete, freeze_mode
+    global current_level, game_over, game_complete
 
     if game_over or game_complete:
         return
 
-    for star in stars:
-        if star.collidepoint(pos):
-            if "red" in star.image:
-                play_sound("ding")
-                if current_level == FINAL_LEVEL:
-                    handle_win()
-                else:
-                    current_level += 1
-                    init_level()
+    hit = topmost(star_pos - star_half, star_pos + star_half, pos)  # The star drawn on top
+    if hit is not None:
+        if "red" in stars[hit].image:
+            play_sound("ding")
+            if current_level == FINAL_LEVEL:
+                handle_win()
             else:
-                play_sound("plop")
-                handle_loss()
-            break
+                current_level += 1
+                init_level()
+        else:
+            play_sound("plop")
+            handle_loss()
     if freeze_mode:
-        freeze_mode = False
+        toggle_freeze()
 
 
 def on_key_down(key):
@@ -253,9 +263,7 @@ def handle_loss():
 
 
 def save_result(result):
-    with open(RESULT_FILE, "w") as f:
-        f.write(result)
-    clock.schedule_unique(sys.exit, 1.5)
+    minigame.finish(result, 1.5, score=current_level)
 
 
 def play_sound(name):
@@ -272,6 +280,8 @@ try:
 except Exception:
     pass
 
+clock.each_tick(tweens.update)
 clock.schedule_interval(schedule_shuffle, 1)
 init_level()
+minigame.begin(globals())
 pgzrun.go()
\ No newline at end of file
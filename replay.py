@@ -0,0 +1,152 @@
+# Record a game session and replay it exactly.
+#   python replay.py record garden.py [--seed N] [--out PATH]
+#   python replay.py play build/replays/garden-20260101-120000.json [--draw-every N] [--check]
+# Recording plays the game in a normal window, on the same simulated clock
+# headless.py uses. Each frame's real dt is saved, and the game sees
+# time.time() and the clock move forward by exactly that dt. Together with
+# the random seed and every input event, that's all a replay needs to hit
+# the same state on every frame. A session can then be replayed without a
+# window as fast as the machine allows: to reproduce a bug, or as a
+# benchmark workload (benchmarks/frame_bench.py --replay PATH). --check
+# compares the replay's result with the recorded one, apart from fields
+# that depend on how often draw() ran (input latency).
+# maze_game.py must use MINIGAME_MODE = "host" while recording; mini-games
+# run in other processes aren't captured.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import pygame
+from pgzero.constants import keys
+
+import headless
+import results_store
+
+REPLAY_DIR = os.path.join(headless.GAME_DIR, "build", "replays")
+VERSION = 1
+DRAW_FIELDS = ["latency"]  # Result fields that depend on how often draw() ran, left out of --check
+
+
+def event_spec(event):
+    # The scripted form (see headless.make_event) of a pygame event, or
+    # None for events the games don't handle
+    if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        try:
+            name = keys(event.key).name.lower()
+        except ValueError:
+            return None  # pgzero ignores keys it has no constant for
+        return {"type": "key_down" if event.type == pygame.KEYDOWN else "key_up", "key": name}
+    if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        kind = "mouse_down" if event.type == pygame.MOUSEBUTTONDOWN else "mouse_up"
+        return {"type": kind, "pos": list(event.pos), "button": event.button}
+    if event.type == pygame.MOUSEMOTION:
+        return {"type": "mouse_move", "pos": list(event.pos), "rel": list(event.rel), "buttons": list(event.buttons)}
+    return None
+
+
+def record(script, seed=None, path=None):
+    headless.dummy = False
+    results_store.enabled = True  # A recording is real play
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    start_time = time.time()
+    events = []
+    dts = []
+    frame_clock = pygame.time.Clock()
+
+    def read_events(frame, module):
+        specs = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                raise SystemExit
+            spec = event_spec(event)
+            if spec:
+                specs.append(spec)
+                events.append([frame, spec])
+        return specs
+
+    def next_dt(frame):
+        dts.append(frame_clock.tick(60) / 1000)
+        return dts[-1]
+
+    # headless flips the window after every draw()
+    session = headless.run_session(script, events=read_events, dt=next_dt, draw_every=1, seed=seed,
+                                   start_time=start_time)
+
+    recording = {
+        "version": VERSION,
+        "script": script,
+        "seed": seed,
+        "start_time": start_time,
+        "dts": dts,
+        "events": events,
+        "result": session["result"],
+    }
+    if path is None:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        name = os.path.splitext(script)[0] + time.strftime("-%Y%m%d-%H%M%S.json")
+        path = os.path.join(REPLAY_DIR, name)
+    with open(path, "w") as f:
+        json.dump(recording, f)
+    print(f"Recorded {len(dts)} frames to {path}")
+    return path
+
+
+def load(path):
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported replay version {recording.get('version')}")
+    return recording
+
+
+def session_options(recording):
+    # headless.run_session() arguments that replay a recording
+    return {
+        "events": recording["events"],
+        "dt": recording["dts"],
+        "frames": len(recording["dts"]),
+        "seed": recording["seed"],
+        "start_time": recording["start_time"],
+    }
+
+
+def comparable(result):
+    # A result without the fields that change with the draw cadence: a
+    # recording draws every frame, a replay usually doesn't
+    if not result:
+        return result
+    return {key: value for key, value in result.items() if key not in DRAW_FIELDS}
+
+
+def play(recording, draw_every=0):
+    session = headless.run_session(recording["script"], draw_every=draw_every, **session_options(recording))
+    # Compare as JSON, the form the recorded result was saved in
+    session["matches"] = comparable(json.loads(json.dumps(session["result"]))) == comparable(recording["result"])
+    return session
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a game session or replay one headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="play a game in a window and record it")
+    record_parser.add_argument("script")
+    record_parser.add_argument("--seed", type=int)
+    record_parser.add_argument("--out")
+    play_parser = commands.add_parser("play", help="replay a recording without a window")
+    play_parser.add_argument("recording")
+    play_parser.add_argument("--draw-every", type=int, default=0, help="call draw() every N frames (0 = never)")
+    play_parser.add_argument("--check", action="store_true", help="exit with status 1 if the result differs")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.script, args.seed, args.out)
+    else:
+        recording = load(args.recording)
+        session = play(recording, args.draw_every)
+        print(json.dumps(session, indent=1))
+        if args.check and not session["matches"]:
+            print("Replay result differs from the recording")
+            sys.exit(1)
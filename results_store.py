@@ -0,0 +1,173 @@
+# Append-only store of every maze session and mini-game result.
+# Results go into an SQLite database in build/ (WAL mode, so queries can run
+# while games are being recorded). record() only puts the row on a queue; a
+# background thread writes whatever has queued up in one transaction, so a
+# frame never waits on the disk. Rows are indexed by game, outcome and the
+# timing columns (frame times and input latency), which keeps win rates and
+# percentiles quick with millions of rows.
+#   python results_store.py [--game NAME] [--column p95_ms] [--db PATH]
+import argparse
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "results.sqlite")
+BATCH_SIZE = 500  # Most rows written in one transaction
+MAZE_GAME = "Maze"  # Game name for whole maze sessions; mini-games use their MINI_GAMES name
+
+enabled = True  # headless.py turns this off, its sessions aren't real play
+
+COLUMNS = ["recorded_at", "session", "game", "outcome", "duration", "score", "lives",
+           "frame_count", "mean_ms", "p95_ms", "max_ms", "latency_p50_ms", "latency_p95_ms"]
+TIMING_COLUMNS = ["duration", "mean_ms", "p95_ms", "max_ms",
+                  "latency_p50_ms", "latency_p95_ms"]  # Columns percentiles() works on
+ADDED_COLUMNS = ["latency_p50_ms", "latency_p95_ms"]  # Missing from databases made before them
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    session INTEGER,
+    game TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    score INTEGER,
+    lives INTEGER,
+    frame_count INTEGER,
+    mean_ms REAL,
+    p95_ms REAL,
+    max_ms REAL,
+    latency_p50_ms REAL,
+    latency_p95_ms REAL
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS results_outcome ON results (game, outcome);
+CREATE INDEX IF NOT EXISTS results_duration ON results (game, duration);
+CREATE INDEX IF NOT EXISTS results_mean_ms ON results (game, mean_ms);
+CREATE INDEX IF NOT EXISTS results_p95_ms ON results (game, p95_ms);
+CREATE INDEX IF NOT EXISTS results_max_ms ON results (game, max_ms);
+CREATE INDEX IF NOT EXISTS results_latency_p50_ms ON results (game, latency_p50_ms);
+CREATE INDEX IF NOT EXISTS results_latency_p95_ms ON results (game, latency_p95_ms);
+"""
+
+
+def connect(path=DB_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent, a crash can only lose the last batches
+    db.execute("PRAGMA cache_size=-65536")  # 64 MB, keeps the indexes' hot pages in memory
+    db.executescript(SCHEMA)
+    present = {row[1] for row in db.execute("PRAGMA table_info(results)")}
+    for column in ADDED_COLUMNS:
+        if column not in present:
+            db.execute(f"ALTER TABLE results ADD COLUMN {column} REAL")
+    db.executescript(INDEXES)
+    return db
+
+
+def make_row(game, result, session=None, lives=None):
+    # A results row from a minigame result dict (see minigame.finish)
+    result = result or {"outcome": "UNKNOWN"}
+    frames = result.get("frames") or {}
+    latency = result.get("latency") or {}
+    inputs = latency.get("count")  # No inputs means no latency, not 0 ms
+    return (time.time(), session, game, result["outcome"], result.get("elapsed"), result.get("score"), lives,
+            frames.get("count"), frames.get("mean_ms"), frames.get("p95_ms"), frames.get("max_ms"),
+            latency.get("p50_ms") if inputs else None, latency.get("p95_ms") if inputs else None)
+
+
+class ResultStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.rows = queue.Queue()
+        self.thread = None
+
+    def record(self, game, result, session=None, lives=None):
+        # Queue a result; it is written on the writer thread
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.write_rows, name="results-writer", daemon=True)
+            self.thread.start()
+        self.rows.put(make_row(game, result, session, lives))
+
+    def write_rows(self):
+        db = connect(self.path)
+        insert = f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        running = True
+        while running:
+            batch = [self.rows.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.rows.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False  # close() was called; write what came before it
+                batch = batch[:batch.index(None)]
+            with db:
+                db.executemany(insert, batch)
+        db.close()
+
+    def close(self):
+        # Write everything still queued and stop the writer
+        if self.thread is not None:
+            self.rows.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+store = ResultStore()
+atexit.register(store.close)
+
+
+def record(game, result, session=None, lives=None):
+    if enabled:
+        store.record(game, result, session, lives)
+
+
+def new_session():
+    # Id shared by a maze session's row and the rows of its mini-games
+    return time.time_ns()
+
+
+# --- QUERIES ---
+def win_rates(db):
+    # {game: (plays, wins, win rate)}
+    rates = {}
+    query = "SELECT game, COUNT(*), SUM(outcome = 'WIN') FROM results GROUP BY game"
+    for game, plays, wins in db.execute(query):
+        rates[game] = (plays, wins, wins / plays)
+    return rates
+
+
+def percentiles(db, game, column="p95_ms", points=(50, 95, 99)):
+    # {point: value} over one game's rows, nearest rank like
+    # minigame.frame_stats(). Each one is a walk along the (game, column) index.
+    if column not in TIMING_COLUMNS:
+        raise ValueError(f"No percentiles for column {column!r}")
+    count = db.execute(f"SELECT COUNT({column}) FROM results WHERE game = ?", (game,)).fetchone()[0]
+    if not count:
+        return {}
+    query = f"SELECT {column} FROM results WHERE game = ? AND {column} IS NOT NULL ORDER BY {column} LIMIT 1 OFFSET ?"
+    return {point: db.execute(query, (game, min(count - 1, int(count * point / 100)))).fetchone()[0]
+            for point in points}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Win rates and timing percentiles from the results store.")
+    parser.add_argument("--game", help="only this game (default: all)")
+    parser.add_argument("--column", default="p95_ms", choices=TIMING_COLUMNS)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    db = connect(args.db)
+    for game, (plays, wins, rate) in sorted(win_rates(db).items()):
+        if args.game and game != args.game:
+            continue
+        spread = ", ".join(f"p{point} {value}" for point, value in percentiles(db, game, args.column).items())
+        print(f"{game}: {plays} plays, {wins} wins ({rate:.1%}), {args.column}: {spread or 'none'}")
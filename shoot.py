@@ -1,18 +1,25 @@
 import os
-import sys
 from random import randint, choice
 
+import numpy as np
 import pgzrun
 import pygame
 from pgzero.actor import Actor
+import atlas
+import latency
+import minigame
+from hit_test import topmost
+from text_cache import Label, draw_text
 
 os.environ["SDL_VIDEO_WINDOW_POS"] = "50,50"
 
+atlas.install()  # Images are drawn from the sprite atlas
+
 # --- CONFIGURATION ---
 WIDTH, HEIGHT = 800, 600
 WIN_TARGET = 25
-RESULT_FILE = "results.txt"
 MAX_SPEED = 15
+FRUIT_COUNT = 1  # Fruits in play at once; hundreds for multi-fruit mode
 
 BOX_LEFT, BOX_TOP = 50, 50
 BOX_RIGHT, BOX_BOTTOM = 540, 540
@@ -20,13 +27,16 @@ BOX_RIGHT, BOX_BOTTOM = 540, 540
 # --- GAME STATE ---
 score = 0
 lives = 3
-bounces = 0
 game_over = False
 
-# Movement
-current_speed = 0
-fruit_vx = 0
-fruit_vy = 0
+# Fruits: one row each in the arrays, so they all move and bounce in one
+# step; the Actors are only moved there to be drawn
+fruits = []
+fruit_pos = np.empty((0, 2))
+fruit_vel = np.empty((0, 2))
+fruit_half = np.empty((0, 2))  # Half width and height
+fruit_bounces = np.empty(0, dtype=int)
+current_speed = 0  # Every fruit's speed while lock_speed is on
 
 # Dev Mode
 DevMode = False
@@ -36,6 +46,11 @@ lock_fruit = False
 set_fruit = 1
 speed_edit = 0
 
+# HUD
+target_label = Label("Target: {}", pos=(550, 50), color="white", fontsize=40)
+score_label = Label("Score: {}", pos=(550, 100), color="white", fontsize=40)
+lives_label = Label("Lives: {}", pos=(550, 150), color="red", fontsize=40)
+
 
 # --- INPUT ---
 def on_key_down(key):
@@ -65,15 +80,15 @@ def on_key_down(key):
 
     elif key == keys.S:
         lock_speed = not lock_speed
-        current_speed = abs(fruit_vx)
+        current_speed = abs(fruit_vel[0, 0])
 
     elif key in (keys.D, keys.A):
         speed_edit += 1 if key == keys.D else -1
-        current_speed = get_speed_from_bounces(bounces + speed_edit)
+        current_speed = get_speed_from_bounces(fruit_bounces[0] + speed_edit)
 
     elif key in (keys.K_1, keys.K_2, keys.K_3, keys.K_4):
         set_fruit = int(key.name[-1])
-        place_fruit()
+        place_fruits()
 
 
 # --- DRAW ---
@@ -89,12 +104,14 @@ def draw():
     )
     screen.draw.filled_rect(box, (135, 206, 235))
 
-    fruit.draw()
+    for fruit, pos in zip(fruits, fruit_pos.tolist()):
+        fruit.pos = pos
+        fruit.draw()
 
     # UI
-    screen.draw.text(f"Target: {WIN_TARGET}", (550, 50), color="white", fontsize=40)
-    screen.draw.text(f"Score: {score}", (550, 100), color="white", fontsize=40)
-    screen.draw.text(f"Lives: {lives}", (550, 150), color="red", fontsize=40)
+    target_label.draw(screen, WIN_TARGET)
+    score_label.draw(screen, score)
+    lives_label.draw(screen, lives)
 
     if DevMode:
         draw_dev_info()
@@ -102,7 +119,8 @@ def draw():
     if game_over:
         text = "YOU WIN!" if score >= WIN_TARGET else "GAME OVER"
         color = "green" if score >= WIN_TARGET else "red"
-        screen.draw.text(
+        draw_text(
+            screen,
             text,
             center=(WIDTH / 2, HEIGHT / 2),
             fontsize=80,
@@ -116,33 +134,38 @@ def draw():
 def draw_dev_lines(start_x, start_y, line_height, lines):
     y = start_y
     for line in lines:
-        screen.draw.text(line, (start_x, y), color="yellow", fontsize=20)
+        draw_text(screen, line, pos=(start_x, y), color="yellow", fontsize=20)
         y += line_height
 
 
 def draw_dev_info():
+    # The numbers are for the first fruit
     mouse_x, mouse_y = pygame.mouse.get_pos()
-    adjusted_bounces = max(0, bounces + speed_edit)
-    speed_formula = round(get_speed_from_bounces(bounces + speed_edit), 5)
+    adjusted_bounces = max(0, fruit_bounces[0] + speed_edit)
+    speed_formula = round(float(get_speed_from_bounces(fruit_bounces[0] + speed_edit)), 5)
+    fruit_vx, fruit_vy = fruit_vel[0]
+    fruit_x, fruit_y = fruit_pos[0]
 
     lines = [
         "DevMode:",
+        f"Fruits: {len(fruits)}",
         f"Bounces: {adjusted_bounces}",
         f"Formula: {speed_formula}",
         f"Speed: {int(abs(fruit_vx))}",
         f"fruit vx: {int(fruit_vx)}",
         f"fruit vy: {int(fruit_vy)}",
-        f"fruit x: {int(fruit.x)}",
-        f"fruit y: {int(fruit.y)}",
+        f"fruit x: {int(fruit_x)}",
+        f"fruit y: {int(fruit_y)}",
         f"cursor x: {mouse_x}",
         f"cursor y: {mouse_y}",
-        f"fruit collide: {fruit.collidepoint((mouse_x, mouse_y))}",
+        f"fruit collide: {fruit_hit((mouse_x, mouse_y)) is not None}",
         f"auto mode: {auto_mode} (SPACE)",
         f"edit lives ({lives}): UP / DOWN",
         f"edit score ({score}): RIGHT / LEFT",
         f"lock speed: {lock_speed} (S)",
         f"edit speed ({speed_edit}): D / A",
         f"set fruit: {set_fruit} (1–4)",
+        *latency.dev_lines(),
     ]
 
     draw_dev_lines(
@@ -155,29 +178,39 @@ def draw_dev_info():
 
 # --- GAME LOGIC ---
 def get_speed_from_bounces(x):
-    x = max(0, x)
+    # Works on a bounce count or an array of them
+    x = np.maximum(x, 0)
     return (-0.9 ** (x + 1) + 1) * MAX_SPEED
 
 
-def update_velocity_magnitude():
-    global current_speed, fruit_vx, fruit_vy
-
-    if not lock_speed:
-        base = bounces + speed_edit if DevMode else bounces
-        current_speed = get_speed_from_bounces(base)
+def update_velocity_magnitude(hit):
+    # New speed for the fruits in `hit` (a mask) after they bounced
+    if lock_speed:
+        speed = np.full(np.count_nonzero(hit), float(current_speed))
+    else:
+        base = fruit_bounces[hit] + speed_edit if DevMode else fruit_bounces[hit]
+        speed = get_speed_from_bounces(base)
 
-    if current_speed == 0 and (not DevMode or bounces > 0):
-        current_speed = get_speed_from_bounces(1)
+    stalled = (speed == 0) & ((fruit_bounces[hit] > 0) | (not DevMode))
+    speed[stalled] = get_speed_from_bounces(1)
 
-    fruit_vx = current_speed if fruit_vx >= 0 else -current_speed
-    fruit_vy = current_speed if fruit_vy >= 0 else -current_speed
+    velocity = fruit_vel[hit]
+    fruit_vel[hit] = np.where(velocity >= 0, speed[:, None], -speed[:, None])
 
 
-def place_fruit():
-    global fruit, fruit_vx, fruit_vy, bounces
+def place_fruits():
+    global fruits, fruit_pos, fruit_vel, fruit_half, fruit_bounces
+    fruits = [None] * FRUIT_COUNT
+    fruit_pos = np.zeros((FRUIT_COUNT, 2))
+    fruit_vel = np.zeros((FRUIT_COUNT, 2))
+    fruit_half = np.zeros((FRUIT_COUNT, 2))
+    fruit_bounces = np.zeros(FRUIT_COUNT, dtype=int)
+    for i in range(FRUIT_COUNT):
+        place_fruit(i)
 
-    bounces = 0
 
+def place_fruit(i):
+    # Replace fruit i with a new one at a random spot
     fruit_types = {
         1: choice(["apple", "pineapple", "orange"]),
         2: "apple",
@@ -186,68 +219,66 @@ def place_fruit():
     }
 
     fruit = Actor(fruit_types[set_fruit])
-    fruit.x = randint(100, 450)
-    fruit.y = randint(100, 450)
+    fruits[i] = fruit
+    fruit_half[i] = fruit.width / 2, fruit.height / 2
+    fruit_pos[i] = randint(100, 450), randint(100, 450)
+    fruit_bounces[i] = 0
 
     start_speed = get_speed_from_bounces(0)
-    fruit_vx = start_speed if choice([True, False]) else -start_speed
-    fruit_vy = start_speed if choice([True, False]) else -start_speed
+    fruit_vel[i, 0] = start_speed if choice([True, False]) else -start_speed
+    fruit_vel[i, 1] = start_speed if choice([True, False]) else -start_speed
 
 
-def update():
-    global fruit_vx, fruit_vy, bounces, score
-
-    if auto_mode and fruit.collidepoint(pygame.mouse.get_pos()) and not game_over:
-        score += 1
-        place_fruit()
-        if score >= WIN_TARGET:
-            handle_game_end("WIN")
+def fruit_hit(pos):
+    # Index of the fruit drawn on top at pos, or None
+    return topmost(fruit_pos - fruit_half, fruit_pos + fruit_half, pos)
 
-    if game_over:
-        return
 
-    fruit.x += fruit_vx
-    fruit.y += fruit_vy
+def shoot_fruit(i):
+    global score
+    score += 1
+    place_fruit(i)
+    if score >= WIN_TARGET:
+        handle_game_end("WIN")
 
-    wall_hit = False
 
-    if fruit.left < BOX_LEFT:
-        fruit.left = BOX_LEFT
-        fruit_vx = abs(fruit_vx)
-        wall_hit = True
+def update():
+    if auto_mode and not game_over:
+        hit = fruit_hit(pygame.mouse.get_pos())
+        if hit is not None:
+            shoot_fruit(hit)
 
-    if fruit.right > BOX_RIGHT:
-        fruit.right = BOX_RIGHT
-        fruit_vx = -abs(fruit_vx)
-        wall_hit = True
+    if game_over:
+        return
 
-    if fruit.top < BOX_TOP:
-        fruit.top = BOX_TOP
-        fruit_vy = abs(fruit_vy)
-        wall_hit = True
+    fruit_pos[:] += fruit_vel
 
-    if fruit.bottom > BOX_BOTTOM:
-        fruit.bottom = BOX_BOTTOM
-        fruit_vy = -abs(fruit_vy)
-        wall_hit = True
+    # Bounce off the box: push back inside and point the velocity away
+    low = fruit_pos - fruit_half
+    high = fruit_pos + fruit_half
+    box_low = np.array([BOX_LEFT, BOX_TOP])
+    box_high = np.array([BOX_RIGHT, BOX_BOTTOM])
+    under = low < box_low
+    over = high > box_high
+    fruit_pos[:] = np.where(under, box_low + fruit_half, np.where(over, box_high - fruit_half, fruit_pos))
+    fruit_vel[:] = np.where(under, np.abs(fruit_vel), np.where(over, -np.abs(fruit_vel), fruit_vel))
 
-    if wall_hit:
+    wall_hit = (under | over).any(axis=1)
+    if wall_hit.any():
         if not lock_speed:
-            bounces += 1
-        update_velocity_magnitude()
+            fruit_bounces[wall_hit] += 1
+        update_velocity_magnitude(wall_hit)
 
 
 def on_mouse_down(pos):
-    global score, lives
+    global lives
 
     if game_over:
         return
 
-    if fruit.collidepoint(pos):
-        score += 1
-        place_fruit()
-        if score >= WIN_TARGET:
-            handle_game_end("WIN")
+    hit = fruit_hit(pos)
+    if hit is not None:
+        shoot_fruit(hit)
     else:
         lives -= 1
         if lives <= 0:
@@ -262,10 +293,7 @@ def handle_game_end(result):
 
     game_over = True
 
-    with open(RESULT_FILE, "w") as f:
-        f.write(result)
-
-    clock.schedule_unique(sys.exit, 1.5)
+    minigame.finish(result, 1.5, score=score)
 
 
 # --- MUSIC ---
@@ -276,5 +304,6 @@ except Exception:
     pass
 
 
-place_fruit()
+place_fruits()
+minigame.begin(globals())
 pgzrun.go()
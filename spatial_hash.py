@@ -0,0 +1,68 @@
+# Uniform-grid spatial hash for collision broadphase.
+# The play area is cut into square cells of CELL_SIZE pixels. Each item is
+# listed in every cell its rect touches, so a query only has to look at the
+# items in the cells under the query rect instead of every item there is.
+# Items can be anything hashable (Actors hash by identity). Inserting,
+# moving and removing only touch the cells involved.
+#   flowers = SpatialHash()
+#   flowers.insert(flower, flower)        # Anything with left/top/right/bottom
+#   for flower in flowers.query(char): ...
+CELL_SIZE = 50  # Pixels; under the sprite size, so queries cover little more than the rect itself
+
+
+class SpatialHash:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of items
+        self.items = {}  # item -> (first column, first row, last column, last row)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def span(self, rect):
+        size = self.cell_size
+        return int(rect.left // size), int(rect.top // size), int(rect.right // size), int(rect.bottom // size)
+
+    def insert(self, item, rect):
+        span = self.span(rect)
+        self.items[item] = span
+        for cell in cells_in(span):
+            self.cells.setdefault(cell, set()).add(item)
+
+    def remove(self, item):
+        for cell in cells_in(self.items.pop(item)):
+            bucket = self.cells[cell]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, item, rect):
+        # Cheap when the item stays inside the same cells, as it mostly does
+        if self.items.get(item) != self.span(rect):
+            if item in self.items:
+                self.remove(item)
+            self.insert(item, rect)
+
+    def clear(self):
+        self.cells.clear()
+        self.items.clear()
+
+    def query(self, rect):
+        # Items in the cells rect touches: every item that can overlap it,
+        # and maybe a few that don't
+        found = set()
+        for cell in cells_in(self.span(rect)):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found |= bucket
+        return found
+
+
+def cells_in(span):
+    first_column, first_row, last_column, last_row = span
+    for column in range(first_column, last_column + 1):
+        for row in range(first_row, last_row + 1):
+            yield column, row
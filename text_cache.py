@@ -0,0 +1,125 @@
+# Cached text drawing for HUDs and dev dashboards.
+# screen.draw.text() re-resolves every option and looks the string up in
+# pgzero's ptext cache on each call. That costs several times a plain blit,
+# and much more for outlined or shadowed text that isn't cached yet.
+# draw_text() takes the same arguments but keeps the finished surface in an
+# LRU cache keyed by the text and style, capped at MAX_BYTES of pixels.
+# Label goes one step further for HUD lines drawn every frame: it only
+# renders again when its values change, so a frame costs one blit.
+#   lives_label = Label("Lives: {}", topright=(520, 10), fontsize=30, color="red")
+#   lives_label.draw(screen, lives)
+from collections import OrderedDict
+
+from pgzero import ptext
+
+MAX_BYTES = 8 * 1024 * 1024  # Pixel memory kept in the shared cache
+
+# Options that only say where the text goes, not what it looks like. The
+# combined ones are split into edges first, as ptext.draw() does.
+COMBINED = {
+    "topleft": ("left", "top"), "bottomleft": ("left", "bottom"),
+    "topright": ("right", "top"), "bottomright": ("right", "bottom"),
+    "midtop": ("centerx", "top"), "midleft": ("left", "centery"),
+    "midbottom": ("centerx", "bottom"), "midright": ("right", "centery"),
+    "center": ("centerx", "centery"),
+}
+HORIZONTAL = {"left": 0, "centerx": 0.5, "right": 1}
+VERTICAL = {"top": 0, "centery": 0.5, "bottom": 1}
+POSITION_OPTIONS = {"pos", "anchor", *COMBINED, *HORIZONTAL, *VERTICAL}
+
+
+def resolve_position(options):
+    # (x, y, hanchor, vanchor, align) following ptext.draw()'s rules
+    edges = {name: options[name] for name in (*HORIZONTAL, *VERTICAL) if options.get(name) is not None}
+    for name, (h, v) in COMBINED.items():
+        if options.get(name):
+            edges[h], edges[v] = options[name]
+
+    x, y = options.get("pos") or (None, None)
+    hanchor, vanchor = options.get("anchor") or (None, None)
+    for name, anchor in HORIZONTAL.items():
+        if name in edges:
+            x, hanchor = edges[name], anchor
+    for name, anchor in VERTICAL.items():
+        if name in edges:
+            y, vanchor = edges[name], anchor
+    if x is None or y is None:
+        raise ValueError("Unable to determine text position")
+
+    align = hanchor
+    if hanchor is None:
+        hanchor = ptext.DEFAULT_ANCHOR[0]
+    if vanchor is None:
+        vanchor = ptext.DEFAULT_ANCHOR[1]
+    return x, y, hanchor, vanchor, align
+
+
+def hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+class TextCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()  # (text, style) -> Surface, oldest first
+        self.bytes = 0
+
+    def surface(self, text, style):
+        key = (text, style)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = ptext.getsurf(text, cache=False, **dict(style))
+        self.surfaces[key] = surface
+        self.bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return surface
+
+    def render(self, text, **options):
+        # The text's surface and the top-left corner to blit it at
+        x, y, hanchor, vanchor, align = resolve_position(options)
+        style = {k: hashable(v) for k, v in options.items() if k not in POSITION_OPTIONS}
+        if style.get("align") is None:
+            style["align"] = align  # Multi-line text lines up like ptext.draw()
+        surface = self.surface(str(text), tuple(sorted(style.items())))
+        return surface, (round(x - hanchor * surface.get_width()), round(y - vanchor * surface.get_height()))
+
+    def draw(self, screen, text, **options):
+        surface, pos = self.render(text, **options)
+        screen.blit(surface, pos)
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+
+cache = TextCache()
+
+
+def draw_text(screen, text, **options):
+    # Drop-in for screen.draw.text(text, **options)
+    if "angle" in options:
+        screen.draw.text(text, **options)  # Rotated text isn't cached here
+        return
+    cache.draw(screen, text, **options)
+
+
+class Label:
+    # One line of HUD text at a fixed place, re-rendered only when the values
+    # passed to draw() change
+    def __init__(self, fmt, **options):
+        self.fmt = fmt
+        self.options = options
+        self.values = None
+        self.surface = None
+        self.pos = None
+
+    def draw(self, screen, *values):
+        if values != self.values:
+            self.values = values
+            self.surface, self.pos = cache.render(self.fmt.format(*values), **self.options)
+        screen.blit(self.surface, self.pos)
@@ -0,0 +1,130 @@
+# Opt-in tracing of the game hooks, written as Chrome trace-event JSON.
+# Set GAME_TRACE=1 to turn it on (mini-game processes inherit it).
+# install() swaps every function a game defines for a wrapper that records
+# a span into a ring buffer. That covers draw, update, the on_* handlers and
+# anything handed to clock.schedule or animate(on_finished=...). Only the
+# latest CAPACITY spans are kept. dump() writes them to build/traces/ for
+# chrome://tracing or ui.perfetto.dev. Mini-games dump when they end, and
+# F9 dumps at any time. Mini-games run in another process send their spans
+# back with their result, and the maze merges them into its own timeline.
+# Timestamps are wall-clock based so spans from different processes line up.
+import collections
+import json
+import os
+import time
+import types
+from time import perf_counter_ns
+
+from pgzero.clock import clock, mkref
+from pgzero.constants import keys
+
+import gameclock
+
+enabled = os.environ.get("GAME_TRACE", "") not in ("", "0")
+CAPACITY = 100000  # Spans kept per process
+DUMP_KEY = keys.F9
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "traces")
+
+spans = collections.deque(maxlen=CAPACITY)   # (name, track, start ns, duration ns)
+merged = collections.deque(maxlen=CAPACITY)  # Chrome events from other processes
+tracks = []  # Track (game) names in the order they were installed
+_EPOCH_NS = time.time_ns() - perf_counter_ns()
+
+_WRAPPER = """
+def {name}({params}):
+    start = perf_counter_ns()
+    try:
+        return fn({params})
+    finally:
+        append((name, track, start, perf_counter_ns() - start))
+"""
+
+
+def wrap(fn, track):
+    # Same parameter names as fn: pgzero passes handler arguments by name
+    code = fn.__code__
+    params = ", ".join(code.co_varnames[:code.co_argcount])
+    scope = {"fn": fn, "name": fn.__name__, "track": track, "append": spans.append,
+             "perf_counter_ns": perf_counter_ns}
+    exec(_WRAPPER.format(name=fn.__name__, params=params), scope)
+    wrapper = scope[fn.__name__]
+    wrapper.__defaults__ = fn.__defaults__
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def can_wrap(value, namespace):
+    if not isinstance(value, types.FunctionType) or value.__globals__ is not namespace:
+        return False
+    code = value.__code__
+    plain = not (code.co_flags & (0x04 | 0x08)) and not code.co_kwonlyargcount  # No *args/**kwargs
+    return plain and not hasattr(value, "__wrapped__")
+
+
+def install(namespace):
+    # Trace every function defined in a game's globals(). Call it before
+    # pgzrun.go(), which is when pgzero picks up draw/update/handlers.
+    if not enabled:
+        return
+    functions = {key: value for key, value in namespace.items() if can_wrap(value, namespace)}
+    if not functions:
+        return
+    track = os.path.splitext(os.path.basename(next(iter(functions.values())).__code__.co_filename))[0]
+    tracks.append(track)
+
+    wrapped = {fn: wrap(fn, track) for fn in functions.values()}
+    for key, fn in functions.items():
+        namespace[key] = wrapped[fn]
+
+    # Callbacks the game scheduled while loading still point at the originals
+    for event in clock.events:
+        if event.callback in wrapped:
+            event.cb = mkref(wrapped[event.callback])
+    clock._each_tick = [mkref(wrapped[ref()]) if ref() in wrapped else ref for ref in clock._each_tick]
+    for entry in gameclock.clock.queue:
+        entry[2] = wrapped.get(entry[2], entry[2])
+
+    namespace['on_key_down'] = dump_hotkey(namespace.get('on_key_down'), track)
+
+
+def dump_hotkey(handler, track):
+    # on_key_down that dumps the trace on DUMP_KEY, then calls the game's own
+    params = handler.__code__.co_varnames[:handler.__code__.co_argcount] if handler else ()
+
+    def on_key_down(key, mod=0, unicode=''):
+        if key == DUMP_KEY:
+            dump(track)
+        if handler:
+            event = {'key': key, 'mod': mod, 'unicode': unicode}
+            return handler(**{param: event[param] for param in params if param in event})
+    return on_key_down
+
+
+def events():
+    # This process's spans as Chrome trace events, one thread per game
+    pid = os.getpid()
+    names = list(dict.fromkeys(tracks))
+    result = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+              for tid, name in enumerate(names)]
+    for name, track, start, duration in spans:
+        result.append({"name": name, "cat": track, "ph": "X", "pid": pid,
+                       "tid": names.index(track) if track in names else 0,
+                       "ts": (start + _EPOCH_NS) / 1000, "dur": duration / 1000})
+    return result
+
+
+def merge(other):
+    # Add spans sent back by a mini-game that ran in another process
+    merged.extend(other)
+
+
+def dump(name=None):
+    if not enabled:
+        return None
+    name = name or (tracks[-1] if tracks else "trace")
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = os.path.join(TRACE_DIR, f"{name}-{os.getpid()}.json")
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events() + list(merged), "displayTimeUnit": "ms"}, f)
+    print(f"Trace written to {path}")
+    return path
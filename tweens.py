@@ -0,0 +1,175 @@
+# Pooled tweens for games with many moving Actors.
+# pgzero's animate() makes a new Animation object for every call, each with
+# its own clock callback, and games tend to keep them in a list long after
+# they have finished. A TweenPool keeps every tween as one slot in a set of
+# NumPy arrays (start, end, elapsed, duration), so one update() moves all
+# of them, and finished slots go straight back on the free list.
+#   tweens = TweenPool()
+#   clock.each_tick(tweens.update)   # gameclock's clock: pauses with the game
+#   tweens.animate(star, duration=2, on_finished=handle_loss, y=HEIGHT)
+# animate() works like pgzero's for numeric attributes: a new tween on an
+# attribute replaces the one running on it, the value at elapsed time t is
+# start + (end - start) * tween(t / duration), and on_finished is called
+# once the last of the call's attributes gets there. pause() and resume()
+# hold every tween where it is without restarting it.
+# animate_item() tweens one element of a NumPy array instead, for games that
+# keep positions in arrays and only copy them to their Actors in draw():
+#   tweens.animate_item(star_pos, (i, 1), HEIGHT, duration=2, on_finished=handle_loss)
+# update() writes those with one assignment per array.
+import numpy as np
+
+
+def accel_decel(n):
+    p = n * 2
+    return np.where(p < 1, 0.5 * p * p, -0.5 * ((p - 1.0) * (p - 3.0) - 1.0))
+
+
+# pgzero's tween functions that make sense on arrays
+TWEENS = [
+    ("linear", lambda n: n),
+    ("accelerate", lambda n: n * n),
+    ("decelerate", lambda n: -1.0 * n * (n - 2.0)),
+    ("accel_decel", accel_decel),
+]
+TWEEN_CODES = {name: code for code, (name, _) in enumerate(TWEENS)}
+
+
+class TweenPool:
+    def __init__(self, capacity=64):
+        self.start = np.zeros(capacity)
+        self.end = np.zeros(capacity)
+        self.elapsed = np.zeros(capacity)
+        self.duration = np.ones(capacity)
+        self.tween = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.owner = np.full(capacity, -1, dtype=np.int32)  # Slot's array in self.arrays, -1 for an attribute
+        self.index = np.zeros(capacity, dtype=np.int64)  # Flat index into that array
+        self.arrays = []  # Arrays animate_item() has tweens running on
+        self.objects = [None] * capacity
+        self.attrs = [None] * capacity
+        self.groups = [None] * capacity  # [slots still running, on_finished] shared by one animate() call
+        self.free = list(range(capacity - 1, -1, -1))
+        self.slots = {}  # (id(object), attr) -> slot
+        self.finished = []  # on_finished callbacks due this update
+        self.paused = False
+
+    def __len__(self):
+        return len(self.slots)
+
+    def grow(self):
+        old = len(self.active)
+        for name in ("start", "end", "elapsed", "duration", "tween", "active", "owner", "index"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+        self.duration[old:] = 1
+        self.owner[old:] = -1
+        for name in ("objects", "attrs", "groups"):
+            getattr(self, name).extend([None] * old)
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+
+    def animate(self, object, tween='linear', duration=1, on_finished=None, **targets):
+        group = [len(targets), on_finished]
+        for attr, end in targets.items():
+            self.take(object, attr, getattr(object, attr), end, tween, duration, group)
+
+    def animate_item(self, array, key, end, tween='linear', duration=1, on_finished=None):
+        # Tween array[key] (a single element) to end
+        slot = self.take(array, key, array[key], end, tween, duration, [1, on_finished])
+        code = next((code for code, known in enumerate(self.arrays) if known is array), None)
+        if code is None:
+            code = len(self.arrays)
+            self.arrays.append(array)
+        self.owner[slot] = code
+        self.index[slot] = np.ravel_multi_index(key if isinstance(key, tuple) else (key,), array.shape)
+
+    def take(self, object, attr, start, end, tween, duration, group):
+        # Set up a free slot, replacing any tween already on object.attr
+        self.remove(self.slots.get((id(object), attr)))
+        if not self.free:
+            self.grow()
+        slot = self.free.pop()
+        self.start[slot] = start
+        self.end[slot] = end
+        self.elapsed[slot] = 0
+        self.duration[slot] = duration
+        self.tween[slot] = TWEEN_CODES[tween]
+        self.active[slot] = True
+        self.owner[slot] = -1
+        self.objects[slot] = object
+        self.attrs[slot] = attr
+        self.groups[slot] = group
+        self.slots[id(object), attr] = slot
+        return slot
+
+    def release(self, slot):
+        # Put a slot back on the free list; True if it was the last one
+        # running for its animate() call
+        group = self.groups[slot]
+        del self.slots[id(self.objects[slot]), self.attrs[slot]]
+        self.active[slot] = False
+        self.objects[slot] = self.attrs[slot] = self.groups[slot] = None
+        self.free.append(slot)
+        if not self.slots:
+            self.arrays = []  # Nothing refers to them any more
+        group[0] -= 1
+        return group[0] == 0
+
+    def remove(self, slot):
+        # Drop a tween without finishing it (it was replaced or stopped)
+        if slot is not None:
+            self.release(slot)
+
+    def stop(self, object):
+        # Stop every tween on object where it is, without on_finished
+        for slot in [slot for (key, _), slot in self.slots.items() if key == id(object)]:
+            self.remove(slot)
+
+    def clear(self):
+        for slot in list(self.slots.values()):
+            self.remove(slot)
+        self.finished = []  # An on_finished may stop everything; the rest don't fire
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def update(self, dt):
+        if self.paused or not self.slots:
+            return
+        slots = np.flatnonzero(self.active)
+        elapsed = self.elapsed[slots] + dt
+        self.elapsed[slots] = elapsed
+        n = elapsed / self.duration[slots]
+        done = n > 1
+        codes = self.tween[slots]
+        if codes.any():
+            n = np.minimum(n, 1)
+            for code, (_, function) in enumerate(TWEENS[1:], 1):
+                curved = codes == code
+                if curved.any():
+                    n[curved] = function(n[curved])
+        start = self.start[slots]
+        end = self.end[slots]
+        values = start + (end - start) * n
+        values[done] = end[done]  # Land exactly on the target
+
+        owners = self.owner[slots]
+        on_arrays = owners >= 0
+        on_objects, object_values = slots, values
+        if on_arrays.any():
+            for code in np.unique(owners[on_arrays]).tolist():
+                chosen = owners == code
+                np.put(self.arrays[code], self.index[slots[chosen]], values[chosen])
+            on_objects, object_values = slots[~on_arrays], values[~on_arrays]
+        objects, attrs = self.objects, self.attrs
+        for slot, value in zip(on_objects.tolist(), object_values.tolist()):
+            setattr(objects[slot], attrs[slot], value)
+
+        for slot in slots[done].tolist():
+            callback = self.groups[slot][1]
+            if self.release(slot) and callback is not None:
+                self.finished.append(callback)
+        while self.finished:
+            self.finished.pop(0)()